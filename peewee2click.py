@@ -1,11 +1,35 @@
 import collections
+import concurrent.futures
+import contextlib
+import csv
 import datetime
 import functools
+import hashlib
+import importlib
+import io
 import itertools
+import json
+import multiprocessing
+import operator
+import os
+import re
+import shlex
+import shutil
+import sys
+import time
+import tracemalloc
 import warnings
+import weakref
 
 from tabulate import tabulate
 import click
+import peewee
+
+try:
+    import resource
+except ImportError:  # pragma: no cover
+    # Not available on Windows
+    resource = None
 
 
 class DateParamType(click.ParamType):
@@ -24,6 +48,453 @@ class DateParamType(click.ParamType):
 DATE_PARAM_TYPE = DateParamType()
 
 
+DBFIELD_TO_TYPE = {
+    ("int",
+     "int unsigned"): int,
+    ("bool", ): bool,
+    ("text", "string"): str,
+    ("float", ): float,
+    ("date", ): DATE_PARAM_TYPE,
+    ("primary_key", ): None
+}
+
+# `DBFIELD_TO_TYPE` flattened to be looked up by database field type.
+_DB_FIELD_TYPES = {db_field: asc_type
+                   for db_fields, asc_type in DBFIELD_TO_TYPE.items()
+                   for db_field in db_fields}
+
+# Option decorators generated by `click_options_from_model_fields`, by model
+# and skipped fields.
+_OPTIONS_CACHE = weakref.WeakKeyDictionary()
+
+
+def _click_type(model, field):
+    """
+    Return the `click` type used to parse values of `field`, or `None` if
+    the field doesn't map to an argument.
+
+    :param model: Model owning the field.
+    :type model: peewee.Model
+
+    :param field: Field to map.
+    :type field: peewee.Field
+
+    """
+    try:
+        return _DB_FIELD_TYPES[field.get_db_field()]
+    except KeyError:
+        pass
+
+    warnings.warn(
+        ("Unknown database type `{field.db_field}` option "
+         "`{model._meta.name}.{field.name}` can't be "
+         "rendered.").format(model=model, field=field),
+        SyntaxWarning)
+    return str
+
+
+WHERE_OPERATORS = collections.OrderedDict([
+    (">=", operator.ge),
+    ("<=", operator.le),
+    ("!=", operator.ne),
+    ("=", operator.eq),
+    (">", operator.gt),
+    ("<", operator.lt),
+])
+
+_WHERE_RE = re.compile(r"^\s*([\w-]+)\s*({})(.*)$".format(
+    "|".join(re.escape(op) for op in WHERE_OPERATORS)))
+
+
+AGGREGATES = {
+    "count": peewee.fn.COUNT,
+    "sum": peewee.fn.SUM,
+    "avg": peewee.fn.AVG,
+    "min": peewee.fn.MIN,
+    "max": peewee.fn.MAX,
+}
+
+
+# Default maximum number of host parameters in a single SQLite statement.
+SQLITE_MAX_VARIABLES = 999
+
+# Query plan lines reporting a full table scan, from SQLite and PostgreSQL.
+# SQLite before 3.36 writes "SCAN TABLE <table> AS <alias>" and later ones
+# "SCAN <alias>". MySQL reports them with an ``ALL`` access type instead.
+_FULL_SCAN_RE = re.compile(r"^SCAN (?:TABLE )?\S+(?: AS \S+)?$|\bSeq Scan on ")
+
+
+class Stats:
+    """
+    Instrumentation of a command: wall time split into SQL statements and
+    fetching rows from cursors (`query`), row formatting and serialization
+    (`format`), writing the output (`render`) and the rest (`other`), plus
+    the number of statements executed, rows processed, the peak resident
+    memory of the process and, if traced, the peak memory allocated by
+    Python. Sections don't overlap: the time spent in a section nested in
+    another one is only accounted to the inner one.
+
+    """
+    SECTIONS = ("query", "format", "render", "other")
+
+    def __init__(self):
+        self.timings = collections.OrderedDict.fromkeys(self.SECTIONS, 0.0)
+        self.statements = 0
+        self.rows = 0
+        self.peak_memory = None
+        self.max_rss = None
+        self._stack = ["other"]
+        self._mark = time.perf_counter()
+
+    def _switch(self):
+        now = time.perf_counter()
+        self.timings[self._stack[-1]] += now - self._mark
+        self._mark = now
+
+    @contextlib.contextmanager
+    def section(self, name):
+        self._switch()
+        self._stack.append(name)
+        try:
+            yield
+        finally:
+            self._switch()
+            self._stack.pop()
+
+    def as_dict(self):
+        result = collections.OrderedDict()
+        result["total_s"] = sum(self.timings.values())
+        for name, elapsed in self.timings.items():
+            result["{}_s".format(name)] = elapsed
+        result["statements"] = self.statements
+        result["rows"] = self.rows
+        result["max_rss_kb"] = self.max_rss
+        result["peak_memory_bytes"] = self.peak_memory
+        return result
+
+    def render(self):
+        lines = ["{:<8} {:.6f}s".format(name[:-2] + ":", value)
+                 for name, value in self.as_dict().items()
+                 if name.endswith("_s")]
+        lines.append("statements: {}".format(self.statements))
+        lines.append("rows: {}".format(self.rows))
+        if self.max_rss is not None:
+            lines.append("max RSS: {} KiB".format(self.max_rss))
+        if self.peak_memory is not None:
+            lines.append("peak memory: {:.1f} KiB".format(
+                self.peak_memory / 1024))
+        return "\n".join(lines)
+
+
+# `Stats` of the command being instrumented by `CRUDL.instrument`, if any.
+_stats = None
+
+
+def _fetching(iterable, size=1000):
+    """
+    Account the time spent fetching the rows of `iterable`, usually a
+    database cursor, to the `query` section of the current `Stats`, if any.
+    Rows are fetched `size` at a time to keep the overhead low.
+
+    """
+    stats = _stats
+    if stats is None:
+        return iterable
+
+    def _rows():
+        # peewee's result iterators have __next__ but no __iter__, so
+        # they can't be given to itertools.islice
+        iterator = iter(iterable)
+        while True:
+            chunk = []
+            with stats.section("query"):
+                try:
+                    for _ in range(size):
+                        chunk.append(next(iterator))
+                except StopIteration:
+                    pass
+            if not chunk:
+                return
+            yield from chunk
+    return _rows()
+
+
+def _timed(section, rows=None):
+    """
+    Account the calls to the decorated function to `section` of the current
+    `Stats`, if any, and the number of rows returned by `rows(result)`.
+
+    :param section: Name of the section.
+    :type section: str
+
+    :param rows: Function returning the number of rows in the result.
+    :type rows: callable
+
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            stats = _stats
+            if stats is None:
+                return func(*args, **kwargs)
+            with stats.section(section):
+                result = func(*args, **kwargs)
+            if rows is not None:
+                stats.rows += rows(result)
+            return result
+        return wrapper
+    return decorator
+
+
+def _database_version(database):
+    """
+    Token changing whenever the contents of `database` may have changed
+    behind our back, or `None` if there is no way to tell. Only SQLite
+    reports it: the modification time and size of the database file and its
+    write-ahead log, which change on every commit of any process.
+
+    ``PRAGMA data_version`` is left out: it counts per connection, so the
+    value stored by one process means nothing to another.
+
+    """
+    if not isinstance(database, peewee.SqliteDatabase) or \
+            database.database in ("", ":memory:"):
+        return None
+    version = []
+    for path in (database.database, database.database + "-wal"):
+        try:
+            stat = os.stat(path)
+        except OSError:
+            continue
+        version += [stat.st_mtime_ns, stat.st_size]
+    return version
+
+
+class ResultCache:
+    """
+    On-disk cache of the output of `CRUDL.show` and `CRUDL.list`, to be set
+    as `CRUDL.CACHE`. Entries are JSON files in a directory per table of
+    `directory`; once they take more than `max_size` bytes the least
+    recently used are removed. Outputs larger than `max_entry_size` bytes,
+    by default an eighth of `max_size`, are not stored.
+
+    Entries of a model are dropped when it is written through `CRUDL`, and
+    are ignored if the database reports a change (see `_database_version`).
+    Without such reports, changes made by other programs go unnoticed.
+
+    :param directory: Directory of the cache, created if needed.
+    :type directory: str
+
+    :param max_size: Maximum size of the entries, in bytes.
+    :type max_size: int
+
+    :param max_entry_size: Maximum size of an entry, in bytes.
+    :type max_entry_size: int
+
+    """
+    def __init__(self, directory, max_size=64 * 1024 * 1024,
+                 max_entry_size=None):
+        self.directory = directory
+        self.max_size = max_size
+        self.max_entry_size = max_entry_size or max_size // 8
+
+    def _model_directory(self, model):
+        database = model._meta.database
+        name = "{}-{}".format(
+            os.path.basename(str(database.database)) or "default",
+            model._meta.db_table)
+        return os.path.join(self.directory, name)
+
+    def _path(self, model, key):
+        digest = hashlib.sha1(key.encode("utf-8")).hexdigest()
+        return os.path.join(self._model_directory(model), digest + ".json")
+
+    def get(self, model, key):
+        """
+        Return the entry stored for `key`, or `None`.
+
+        """
+        path = self._path(model, key)
+        try:
+            with open(path, encoding="utf-8") as file:
+                entry = json.load(file)
+        except (OSError, ValueError):
+            return None
+        if entry["key"] != key or entry["version"] != _database_version(
+                model._meta.database):
+            return None
+        # Mark it as recently used.
+        os.utime(path)
+        return entry
+
+    def set(self, model, key, entry):
+        """
+        Store `entry`, a JSON serializable dict, for `key` unless it is
+        larger than `max_entry_size`, and evict the least recently used
+        entries if needed.
+
+        """
+        path = self._path(model, key)
+        entry = json.dumps(dict(
+            entry, key=key, version=_database_version(model._meta.database)))
+        if len(entry) > self.max_entry_size:
+            return
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temporary = "{}.tmp".format(path)
+        with open(temporary, "w", encoding="utf-8") as file:
+            file.write(entry)
+        os.replace(temporary, path)
+        self.evict()
+
+    def evict(self):
+        """
+        Remove the least recently used entries until they fit in
+        `max_size`.
+
+        """
+        entries = []
+        for root, _, names in os.walk(self.directory):
+            for name in names:
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+
+        size = sum(entry[1] for entry in entries)
+        for _, entry_size, path in sorted(entries):
+            if size <= self.max_size:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            size -= entry_size
+
+    def invalidate(self, model):
+        """
+        Drop the entries of `model`.
+
+        """
+        shutil.rmtree(self._model_directory(model), ignore_errors=True)
+
+    def call(self, model, key, func):
+        """
+        Replay the output and result of `func` stored for `key`, or call it
+        capturing them and store them. Inside a transaction `func` is just
+        called, as what it reads may still be rolled back.
+
+        """
+        if model._meta.database.transaction_depth() > 0:
+            return func()
+
+        entry = self.get(model, key)
+        if entry is None:
+            out, err = io.StringIO(), io.StringIO()
+            # contextlib.redirect_stderr needs Python 3.5
+            stderr, sys.stderr = sys.stderr, err
+            try:
+                with contextlib.redirect_stdout(out):
+                    result = func()
+            finally:
+                sys.stderr = stderr
+            entry = {"out": out.getvalue(), "err": err.getvalue(),
+                     "result": result}
+            self.set(model, key, entry)
+        click.echo(entry["out"], nl=False)
+        if entry["err"]:
+            click.echo(entry["err"], nl=False, err=True)
+        return entry["result"]
+
+
+def _cached(bounded=None):
+    """
+    Serve the calls to the decorated `CRUDL` reading method from its `CACHE`,
+    if any, unless they stream, explain or instrument the query, print a
+    machine readable format (always streamed, see `CRUDL.print_rows`) or
+    `bounded(kwargs)` returns false because the output could be as large as
+    the table.
+
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(cls, model, *args, **kwargs):
+            cache = cls.CACHE
+            if cache is None or _stats is not None or \
+                    any(kwargs.get(name)
+                        for name in ("stream", "explain", "stats")) or \
+                    kwargs.get("fmt", "table") != "table" or \
+                    (bounded is not None and not bounded(kwargs)):
+                return func(cls, model, *args, **kwargs)
+            key = repr((cls.__module__, cls.__qualname__, func.__name__,
+                        args, sorted(kwargs.items())))
+            return cache.call(model, key,
+                              lambda: func(cls, model, *args, **kwargs))
+        return wrapper
+    return decorator
+
+
+def _invalidates(cascade=False):
+    """
+    Drop the `CACHE` entries of the model written by the decorated `CRUDL`
+    method, before the write and after it, and with `cascade` also those of
+    the models depending on it (see `_delete_plan`).
+
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(cls, model, *args, **kwargs):
+            cache = cls.CACHE
+            if cache is None:
+                return func(cls, model, *args, **kwargs)
+
+            models = [model]
+            if cascade:
+                models += [fk.model_class for fk, _ in _delete_plan(model,
+                                                                    True)]
+            for written in models:
+                cache.invalidate(written)
+            try:
+                return func(cls, model, *args, **kwargs)
+            finally:
+                for written in models:
+                    cache.invalidate(written)
+        return wrapper
+    return decorator
+
+
+def _compose(decorators):
+    """
+    Return one decorator that applies all the given `decorators`.
+
+    :param decorators: Decorators to apply, innermost first.
+    :type decorators: iterable
+
+    """
+    return lambda f: functools.reduce(lambda g, h: h(g), decorators, f)
+
+
+def _chunked(iterable, size):
+    """
+    Split `iterable` into lists of at most `size` elements, lazily.
+
+    :param iterable: Elements to split.
+    :type iterable: iterable
+
+    :param size: Maximum length of each chunk.
+    :type size: int
+
+    """
+    iterator = iter(iterable)
+    while True:
+        chunk = list(itertools.islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
 def _number_of_arguments_in_list(ctx, *what):
     """
     Return the number of `what` found as `ctx` dict keys with a value
@@ -75,59 +546,580 @@ def max_one(ctx, *what):
              "at a time: %r") % [what])
 
 
+def _primary_key_names(model):
+    """
+    Return the names of the fields composing the primary key of `model`.
+
+    :param model: Model to inspect.
+    :type model: peewee.Model
+
+    """
+    pk = model._meta.primary_key
+    if isinstance(pk, peewee.CompositeKey):
+        return list(pk.field_names)
+    return [pk.name]
+
+
+def _field_names(model):
+    """
+    Names of the fields of `model`, primary key first and the rest in
+    declaration order.
+
+    """
+    # `_meta.sorted_field_names` is missing in peewee 2.6 and
+    # `_meta.get_fields()` since 2.7.
+    fields = sorted(model._meta.fields.values(),
+                    key=lambda field: field._sort_key)
+    return [field.name for field in fields]
+
+
+def _projection(model, fields):
+    """
+    Return the columns of `model` needed to render `fields`, primary key
+    included, or `None` if some of them is not a database field (a property,
+    for example) and the whole row must be fetched.
+
+    :param model: Model to select from.
+    :type model: peewee.Model
+
+    :param fields: Names of the fields to render.
+    :type fields: list
+
+    """
+    model_fields = model._meta.fields
+    if not all(f in model_fields for f in fields):
+        return None
+
+    names = _primary_key_names(model)
+    names += [f for f in fields if f not in names]
+    return [model_fields[n] for n in names]
+
+
+def _value_getters(klass, fields):
+    """
+    Return a function per field reading its value from an instance of
+    `klass`. Foreign keys are read as the raw related id, so displaying them
+    doesn't fetch the related row (one extra query per instance).
+
+    :param klass: Class of the instances to read.
+    :type klass: type
+
+    :param fields: Names of the fields to read.
+    :type fields: list
+
+    """
+    meta = getattr(klass, '_meta', None)
+    getters = []
+    for name in fields:
+        field = None if meta is None else meta.fields.get(name)
+        if isinstance(field, peewee.ForeignKeyField):
+            getters.append(lambda elem, name=name: elem._data.get(name))
+        else:
+            getters.append(operator.attrgetter(name))
+    return getters
+
+
+def _json_default(value):
+    """
+    Serialize to JSON the values `json` doesn't know about: dates and times
+    as ISO strings, anything else (decimals, UUIDs...) as text.
+
+    """
+    if isinstance(value, (datetime.date, datetime.time)):
+        return value.isoformat()
+    return str(value)
+
+
+def _condition_fields(node):
+    """
+    Yield the fields referenced by a peewee expression, in order.
+
+    """
+    if isinstance(node, peewee.Field):
+        yield node
+    elif isinstance(node, peewee.Expression):
+        yield from _condition_fields(node.lhs)
+        yield from _condition_fields(node.rhs)
+    elif isinstance(node, peewee.Clause):
+        yield from _condition_fields(node.nodes)
+    elif isinstance(node, peewee.Func):
+        yield from _condition_fields(node.arguments)
+    elif isinstance(node, (list, tuple)):
+        for child in node:
+            yield from _condition_fields(child)
+
+
+def _indexed_field_names(model):
+    """
+    Names of the fields an index can be searched by: the primary key, indexed
+    and unique fields, and the leading field of every multi-column index.
+
+    """
+    names = set(_primary_key_names(model))
+    names.update(name for name, field in model._meta.fields.items()
+                 if field.index or field.unique)
+    names.update(fields[0] for fields, _ in model._meta.indexes)
+    return names
+
+
+def _repr_width(field):
+    """
+    Return the maximum length of the `repr` of the values of `field`, or
+    `None` if the field type doesn't bound it.
+
+    :param field: Field to inspect.
+    :type field: peewee.Field
+
+    """
+    if isinstance(field, peewee.ForeignKeyField):
+        width = _repr_width(field.to_field)
+    elif isinstance(field, peewee.BooleanField):
+        width = len("False")
+    elif isinstance(field, getattr(peewee, 'TimestampField', ())):
+        # Not available in every peewee 2 version, stored as an integer but
+        # rendered as a datetime.
+        width = None
+    elif isinstance(field, getattr(peewee, 'SmallIntegerField', ())):
+        # Added in peewee 2.8
+        width = len(str(-2 ** 15))
+    elif isinstance(field, peewee.BigIntegerField):
+        width = len(str(-2 ** 63))
+    elif isinstance(field, peewee.IntegerField):
+        width = len(str(-2 ** 31))
+    elif isinstance(field, peewee.DateField):
+        width = len(repr(datetime.date(2017, 12, 31)))
+    elif isinstance(field, peewee.CharField) and field.max_length:
+        # Quotes included
+        width = field.max_length + 2
+    else:
+        width = None
+
+    if width is not None and field.null:
+        width = max(width, len("None"))
+    return width
+
+
+def _is_number(value):
+    """
+    Tell whether the string `value` is a number.
+
+    """
+    try:
+        float(value)
+    except ValueError:
+        return False
+    return True
+
+
+def _resolve_model(spec):
+    """
+    Return the model described by `spec`: either the model itself, an import
+    path in the form ``package.module:Model`` or a callable returning it.
+
+    :param spec: Model specification.
+    :type spec: type, str or callable
+
+    """
+    if isinstance(spec, type):
+        return spec
+    if isinstance(spec, str):
+        module, _, path = spec.partition(':')
+        obj = importlib.import_module(module)
+        for attr in path.split('.'):
+            obj = getattr(obj, attr)
+        return obj
+    return spec()
+
+
+def _delete_plan(model, delete_nullable):
+    """
+    Walk the models depending on `model` through their foreign keys, as
+    `peewee.Model.dependencies` does, and return a list of
+    `(foreign_key, parent_step)` steps, parents before their dependents.
+    `parent_step` is the index of the step of the model referenced by the
+    foreign key, or `None` for `model` itself.
+
+    :param model: Model whose records are going to be deleted.
+    :type model: peewee.Model
+
+    :param delete_nullable: Whether nullable dependents are deleted too
+                            (and so are their own dependents) instead of
+                            having their foreign key set to NULL.
+    :type delete_nullable: bool
+
+    """
+    steps = []
+    queue = collections.deque([(model, None)])
+    seen = set()
+    while queue:
+        klass, step = queue.popleft()
+        if klass in seen:
+            continue
+        seen.add(klass)
+        for fk in klass._meta.reverse_rel.values():
+            steps.append((fk, step))
+            if not fk.null or delete_nullable:
+                queue.append((fk.model_class, len(steps) - 1))
+    return steps
+
+
+def _pk_ranges(model, partitions, condition=None, split="minmax"):
+    """
+    Split the primary keys of the rows of `model` matching `condition` in up
+    to `partitions` consecutive ranges, returned as `(low, high)` tuples
+    where `low` is inclusive, `high` exclusive and `None` means unbounded.
+
+    With ``split="minmax"`` the ranges evenly divide the interval between the
+    minimum and maximum keys. With ``split="quantiles"``, or if the keys are
+    not integers, the boundaries are the keys found at evenly spaced
+    offsets, so every range has the same number of rows even if the keys
+    are skewed or not numeric.
+
+    """
+    pk = model._meta.primary_key
+    query = model.select()
+    if condition is not None:
+        query = query.where(condition)
+
+    if split not in ("minmax", "quantiles"):
+        raise ValueError("Unknown split {!r}".format(split))
+
+    if split == "minmax":
+        low, high = query.select(peewee.fn.MIN(pk), peewee.fn.MAX(pk)) \
+                         .tuples().get()
+        if low is None:
+            return [(None, None)]
+        if not all(isinstance(key, int) and not isinstance(key, bool)
+                   for key in (low, high)):
+            split = "quantiles"
+
+    if split == "minmax":
+        step = (high - low + 1) / partitions
+        bounds = [low + int(step * i) for i in range(1, partitions)]
+    else:
+        total = query.count()
+        bounds = []
+        for i in range(1, partitions):
+            offset = total * i // partitions
+            row = query.select(pk).order_by(pk).offset(offset).limit(1) \
+                       .tuples().first()
+            if row is not None:
+                bounds.append(row[0])
+
+    bounds = sorted(set(bounds))
+    return list(zip([None] + bounds, bounds + [None]))
+
+
+def _load_watermarks(path):
+    """
+    Read the watermarks of the incremental exports stored in the JSON file
+    `path`, by model name. A missing file has none.
+
+    """
+    try:
+        with open(path, encoding="utf-8") as file:
+            return json.load(file)
+    except FileNotFoundError:
+        return {}
+
+
+def _save_watermarks(path, watermarks):
+    """
+    Write the watermarks to the JSON file `path`, replacing it atomically so
+    an interrupted run keeps the previous ones.
+
+    """
+    temporary = "{}.tmp".format(path)
+    with open(temporary, "w", encoding="utf-8") as file:
+        json.dump(watermarks, file, indent=2, sort_keys=True)
+    os.replace(temporary, path)
+
+
+def _export_range(task):
+    """
+    Export the rows of one primary key range to its own file, in a worker
+    process of `CRUDL.export_partitioned`. Return the number of rows.
+
+    """
+    crudl, spec, path, fmt, where, low, high = task
+    model = _resolve_model(spec)
+    pk = model._meta.primary_key
+    condition = None
+    if low is not None:
+        condition = pk >= low
+    if high is not None:
+        condition = pk < high if condition is None else \
+            condition & (pk < high)
+
+    database = model._meta.database
+    try:
+        with open(path, "w", encoding="utf-8", newline="") as file:
+            return crudl.export(model, file, fmt=fmt, where=where,
+                                condition=condition)
+    finally:
+        if not database.is_closed():
+            database.close()
+
+
+class _KeysetCursor:
+    """
+    Iterate over the rows of `query` ordered by primary key using keyset
+    (seek) pagination: every page is fetched with `WHERE pk > last_key`
+    instead of an OFFSET, so the cost of a page doesn't depend on its
+    position. The last key seen is kept in `last_key` so the listing can be
+    resumed later.
+
+    :param query: Select query over the model.
+    :type query: peewee.SelectQuery
+
+    :param pk: Primary key field of the model.
+    :type pk: peewee.Field
+
+    :param after: Only return rows with a primary key greater than this one.
+
+    :param limit: Maximum number of rows to return.
+    :type limit: int
+
+    :param page_size: Number of rows fetched per query.
+    :type page_size: int
+
+    :param key: Function returning the primary key of a row, by default the
+                one of model instances.
+    :type key: callable
+
+    """
+    def __init__(self, query, pk, after=None, limit=None, page_size=None,
+                 key=None):
+        self.query = query.order_by(pk)
+        self.pk = pk
+        self.key = key or (lambda row: row._get_pk_value())
+        self.last_key = after
+        self.limit = limit
+        self.page_size = page_size
+        self.count = 0
+
+    def page(self, size=None):
+        """
+        Query of the next page of `size` rows.
+
+        """
+        page = self.query
+        if self.last_key is not None:
+            page = page.where(self.pk > self.last_key)
+        if size is not None:
+            page = page.limit(size)
+        return page
+
+    def __iter__(self):
+        while True:
+            size = self.page_size
+            if self.limit is not None:
+                remaining = self.limit - self.count
+                if remaining <= 0:
+                    return
+                size = remaining if size is None else min(size, remaining)
+
+            fetched = 0
+            for row in self.page(size).iterator():
+                fetched += 1
+                self.count += 1
+                self.last_key = self.key(row)
+                yield row
+
+            if size is None or fetched < size:
+                return
+
+
 class CRUDL:
     """
     CRUD+L over peewee models.
 
     """
     TABLEFMT = "plain"
+    MODEL_COMMANDS = ("create", "delete", "list", "show", "update")
+    GROUP_COMMANDS = ("batch", "dump", "export", "shell")
+    OUTPUT_FORMATS = ("table", "jsonl", "csv", "tsv")
+    STREAM_CHUNK_SIZE = 1000
+    STREAM_MAX_WIDTH = 40
+    BULK_BATCH_SIZE = 500
+    BULK_PREVIEW_SIZE = 5
+    DUMP_WORKERS = 4
+    # Read written records back from the database after create and update,
+    # instead of rendering them from memory.
+    VERIFY_WRITES = False
+    # `ResultCache` of `show` and `list`, if any.
+    CACHE = None
 
     @classmethod
+    @_timed("render")
     def print_table(cls, *args, **kwargs):
         table = tabulate(*args, tablefmt=cls.TABLEFMT, **kwargs)
         click.echo("\n{}\n".format(table))
 
+    @classmethod
+    @_timed("render")
+    def print_table_stream(cls, chunks, headers, model=None):
+        """
+        Print every chunk of rows as soon as it arrives, so only one chunk is
+        held in memory at a time.
+
+        Column widths are fixed before printing the first row: from the
+        `model` metadata when the field bounds the length of its values (see
+        `_repr_width`) or from the first chunk otherwise, and never wider
+        than `STREAM_MAX_WIDTH`. Longer values are truncated. Numeric
+        columns are right aligned, as `tabulate` does.
+
+        Only the "plain" and "simple" `TABLEFMT` are rendered this way. Any
+        other format is handed to `tabulate` one chunk at a time: every
+        chunk comes out as a table of its own, with its own column widths
+        and the headers only above the first one.
+
+        """
+        chunks = iter(chunks)
+        first = next(chunks, [])
+
+        if cls.TABLEFMT not in ("plain", "simple"):
+            click.echo()
+            click.echo(tabulate(first, headers=headers,
+                                tablefmt=cls.TABLEFMT))
+            for chunk in chunks:
+                if chunk:
+                    click.echo(tabulate(chunk, tablefmt=cls.TABLEFMT))
+            click.echo()
+            return
+
+        widths, numeric = [], []
+        for i, header in enumerate(headers):
+            column = [str(row[i]) for row in first]
+            field = None if model is None else model._meta.fields.get(header)
+            width = None if field is None else _repr_width(field)
+            if width is None:
+                width = max([len(value) for value in column] or [0])
+            widths.append(max(len(header), min(width, cls.STREAM_MAX_WIDTH)))
+
+            values = [value for value in column if value != "None"]
+            numeric.append(bool(values) and all(map(_is_number, values)))
+
+        def _line(cells):
+            line = []
+            for value, width, right in zip(cells, widths, numeric):
+                value = str(value)
+                if len(value) > width:
+                    value = value[:max(width - 3, 0)] + "..."[:width]
+                line.append(value.rjust(width) if right
+                            else value.ljust(width))
+            return "  ".join(line).rstrip()
+
+        click.echo()
+        click.echo(_line(headers))
+        if cls.TABLEFMT == "simple":
+            click.echo("  ".join("-" * width for width in widths))
+        for chunk in itertools.chain([first], chunks):
+            if chunk:
+                click.echo("\n".join(_line(row) for row in chunk))
+        click.echo()
+
+    @classmethod
+    @_timed("render")
+    def print_rows(cls, rows, headers, fmt, file=None):
+        """
+        Write `rows` of native values in the machine readable format `fmt`
+        (JSON Lines, CSV or TSV), a chunk of `STREAM_CHUNK_SIZE` rows at a
+        time and without computing column widths, to `file` or stdout.
+
+        Return the number of rows written.
+
+        """
+        if fmt == "jsonl":
+            def _render(chunk):
+                return "".join(
+                    json.dumps(dict(zip(headers, row)),
+                               default=_json_default) + "\n"
+                    for row in chunk)
+        elif fmt in ("csv", "tsv"):
+            buffer = io.StringIO()
+            writer = csv.writer(buffer, lineterminator="\n",
+                                delimiter="," if fmt == "csv" else "\t")
+            writer.writerow(headers)
+            click.echo(buffer.getvalue(), nl=False, file=file)
+
+            def _render(chunk):
+                buffer.seek(0)
+                buffer.truncate()
+                writer.writerows(chunk)
+                return buffer.getvalue()
+        else:
+            raise click.BadParameter("Unknown format {!r}".format(fmt))
+
+        count = 0
+        for chunk in _chunked(rows, cls.STREAM_CHUNK_SIZE):
+            count += len(chunk)
+            if _stats is not None:
+                _stats.rows += len(chunk)
+            if _stats is None:
+                text = _render(chunk)
+            else:
+                with _stats.section("format"):
+                    text = _render(chunk)
+            click.echo(text, nl=False, file=file)
+        return count
+
+    @staticmethod
+    def iter_element_values(elems, fields):
+        """
+        Yield, lazily, the list of native values of `fields` of each element.
+
+        """
+        getters = None
+        for e in elems:
+            if getters is None:
+                getters = _value_getters(type(e), fields)
+            yield [g(e) for g in getters]
+
     @staticmethod
+    @_timed("format", rows=len)
+    def format_tuples(rows, indices, formatters=None):
+        """
+        Format the columns at `indices` of the tuples in `rows`, skipping the
+        instantiation of a model per row. `formatters` has a function per
+        column, `repr` by default.
+
+        """
+        if formatters is None:
+            getter = operator.itemgetter(*indices)
+            if len(indices) == 1:
+                return [[repr(getter(row))] for row in rows]
+            return [list(map(repr, getter(row))) for row in rows]
+
+        columns = list(zip(indices, formatters))
+        return [[f(row[i]) for i, f in columns] for row in rows]
+
+    @staticmethod
+    @_timed("format", rows=lambda result: 1)
     def format_single_element(elem, fields):
-        return [(k, repr(getattr(elem, k))) for k in fields]
+        getters = _value_getters(type(elem), fields)
+        return [(k, repr(g(elem))) for k, g in zip(fields, getters)]
 
     @staticmethod
+    @_timed("format", rows=len)
     def format_multiple_elements(elems, fields):
         res = []
+        getters = None
         for e in elems:
-            res.append([repr(getattr(e, f)) for f in fields])
+            if getters is None:
+                getters = _value_getters(type(e), fields)
+            res.append([repr(g(e)) for g in getters])
         return res
 
     @staticmethod
     def click_options_from_model_fields(model, skip=None):
         def _options_from_model():
-            DBFIELD_TO_TYPE = {
-                ("int",
-                 "int unsigned"): int,
-                ("bool", ): bool,
-                ("text", "string"): str,
-                ("float", ): float,
-                ("date", ): DATE_PARAM_TYPE,
-                ("primary_key", ): None
-            }
-
             fields = sorted(model._meta.fields.values(), reverse=True)
             for field in fields:
                 if skip and field.name in skip:
                     continue
 
-                for db_fields, asc_type in DBFIELD_TO_TYPE.items():
-                    if field.get_db_field() in db_fields:
-                        type_ = asc_type
-                        break
-                else:
-                    warnings.warn(
-                        ("Unknown database type `{field.db_field}` option "
-                         "`{model._meta.name}.{field.name}` can't be "
-                         "rendered.").format(model=model, field=field),
-                        SyntaxWarning)
-                    type_ = str
-
+                type_ = _click_type(model, field)
                 if type_ is None:
                     # This type of field doesn't map to an argument
                     continue
@@ -144,28 +1136,480 @@ class CRUDL:
                         is_flag=True,
                         help="Set {} to NULL.".format(field.name))
 
-                yield click.option(name,
-                                   type=type_,
-                                   help=help)
+                yield click.option(name,
+                                   type=type_,
+                                   help=help)
+
+        # The decorators are generated once per model and skipped fields, and
+        # can be applied to any number of commands afterwards.
+        key = frozenset(skip or ())
+        cached = _OPTIONS_CACHE.setdefault(model, {})
+        if key not in cached:
+            cached[key] = list(_options_from_model())
+
+        # Using function composition we compose all the decorators generated by
+        # `_options_from_model` and we return one that groups them all.
+        return _compose(cached[key])
+
+    @classmethod
+    def click_list_options(cls):
+        """
+        Options accepted by `CRUDL.list`, to be forwarded as keyword
+        arguments.
+
+        """
+        return _compose([
+            click.option("--stream", is_flag=True,
+                         help=("Print rows as they are read from the "
+                               "database instead of all at the end.")),
+            click.option("--limit", type=click.IntRange(min=1),
+                         help="Maximum number of rows to show."),
+            click.option("--after",
+                         help=("Only show rows with a primary key greater "
+                               "than this one.")),
+            click.option("--page-size", type=click.IntRange(min=1),
+                         help=("Number of rows fetched from the database "
+                               "per query.")),
+            click.option("fmt", "--format",
+                         type=click.Choice(cls.OUTPUT_FORMATS),
+                         default="table",
+                         help=("Output format. Other than `table`, rows are "
+                               "streamed with their native values.")),
+            click.option("--count", is_flag=True,
+                         help="Only show the number of rows."),
+            click.option("--group-by", multiple=True, metavar="FIELD",
+                         help=("Show one row per distinct value of FIELD "
+                               "with the `--agg` aggregates. Can be "
+                               "repeated.")),
+            click.option("--agg", multiple=True,
+                         help=("Aggregate to compute: count or "
+                               "{}:FIELD. Can be repeated.").format(
+                                   "|".join(sorted(AGGREGATES)))),
+            click.option("--stats", type=click.Choice(["text", "json"]),
+                         help=("Print timings, statements, rows and peak "
+                               "memory on stderr.")),
+            click.option("--trace-memory", is_flag=True,
+                         help=("With --stats, also trace the memory "
+                               "allocated by Python. Slow.")),
+            click.option("--explain", is_flag=True,
+                         help=("Print the query plan instead of running the "
+                               "query.")),
+            click.option("--where", multiple=True,
+                         help=("Filter rows with FIELD<op>VALUE, where <op> "
+                               "is one of {}. Use NULL as value to match "
+                               "null fields. Can be repeated.").format(
+                                   ", ".join(WHERE_OPERATORS))),
+        ])
+
+    @staticmethod
+    def where_from_options(model, where):
+        """
+        Compile `--where` filters into a peewee expression, or `None` if
+        there are no filters. Values are converted with the same types used
+        by `click_options_from_model_fields`.
+
+        :param model: Model to filter.
+        :type model: peewee.Model
+
+        :param where: Filters in the form FIELD<op>VALUE.
+        :type where: list
+
+        """
+        expressions = []
+        for condition in where or ():
+            match = _WHERE_RE.match(condition)
+            if match is None:
+                raise click.BadParameter(
+                    "{!r} is not in the form FIELD<op>VALUE".format(
+                        condition),
+                    param_hint="--where")
+
+            name, op, value = match.groups()
+            name = name.replace('-', '_')
+            value = value.strip()
+            field = model._meta.fields.get(name)
+            if field is None:
+                raise click.BadParameter(
+                    "{!r} is not a field of {}".format(
+                        name, model._meta.name),
+                    param_hint="--where")
+
+            if value.upper() == "NULL" and op in ("=", "!="):
+                expression = field >> None
+                expressions.append(expression if op == "=" else ~expression)
+                continue
+
+            type_ = _click_type(model, field)
+            if type_ is not None:
+                value = click.types.convert_type(type_).convert(
+                    value, None, None)
+            expressions.append(WHERE_OPERATORS[op](field, value))
+
+        if not expressions:
+            return None
+        return functools.reduce(operator.and_, expressions)
+
+    @staticmethod
+    def fields_from_options(options):
+        null_fields = {k[:-len('_set_null')]: None
+                       for k, v in options.items()
+                       if k.endswith('_set_null') and v}
+
+        non_null_fields = {k: v for k, v in options.items()
+                           if not k.endswith('_set_null') and v is not None}
+
+        return collections.ChainMap(null_fields, non_null_fields)
+
+    @staticmethod
+    @contextlib.contextmanager
+    def instrument(model, output="text", trace_memory=False):
+        """
+        Collect the `Stats` of the code run inside the context, hooking the
+        statements executed by the database of `model`, and print them on
+        stderr as text or, with ``output="json"``, as a JSON line. Does
+        nothing if `output` is `None`.
+
+        With `trace_memory` the memory allocated by Python is traced with
+        `tracemalloc`, which slows down the code measured considerably.
+
+        """
+        global _stats
+
+        if output is None or _stats is not None:
+            yield _stats
+            return
+
+        database = model._meta.database
+        execute_sql = database.execute_sql
+        patched = "execute_sql" in vars(database)
+
+        def _execute_sql(*args, **kwargs):
+            stats.statements += 1
+            with stats.section("query"):
+                return execute_sql(*args, **kwargs)
+
+        tracing = tracemalloc.is_tracing()
+        if trace_memory and not tracing:
+            tracemalloc.start()
+        stats = _stats = Stats()
+        database.execute_sql = _execute_sql
+        try:
+            yield stats
+        finally:
+            stats._switch()
+            _stats = None
+            if patched:
+                database.execute_sql = execute_sql
+            else:
+                del database.execute_sql
+            if trace_memory:
+                stats.peak_memory = tracemalloc.get_traced_memory()[1]
+                if not tracing:
+                    tracemalloc.stop()
+            if resource is not None:
+                # KiB on Linux, bytes on macOS
+                stats.max_rss = resource.getrusage(
+                    resource.RUSAGE_SELF).ru_maxrss
+
+            if output == "json":
+                data = collections.OrderedDict(model=model._meta.name)
+                data.update(stats.as_dict())
+                click.echo(json.dumps(data), err=True)
+            else:
+                click.echo(stats.render(), err=True)
+
+    @classmethod
+    def explain(cls, model, query):
+        """
+        Print the SQL of `query` and the plan the database would follow to
+        run it, without running it: ``EXPLAIN QUERY PLAN`` on SQLite,
+        ``EXPLAIN`` on other backends. Full table scans are flagged, along
+        with the fields of the WHERE clause that could be indexed to avoid
+        them.
+
+        Return `True` if the plan has no full table scans.
+
+        """
+        database = model._meta.database
+        sql, params = query.sql()
+        click.echo("SQL: {}".format(sql))
+        if params:
+            click.echo("Params: {}".format(params))
+
+        if isinstance(database, peewee.SqliteDatabase):
+            prefix = "EXPLAIN QUERY PLAN "
+        else:
+            prefix = "EXPLAIN "
+        cursor = database.execute_sql(prefix + sql, params)
+        headers = [column[0] for column in cursor.description]
+        rows = cursor.fetchall()
+        cls.print_table(rows, headers=headers)
+
+        scans = []
+        for row in rows:
+            values = dict(zip(headers, row))
+            if values.get("type") == "ALL":
+                # MySQL
+                scans.append("table {} type ALL".format(values.get("table")))
+                continue
+            scans.extend(str(value) for value in row
+                         if _FULL_SCAN_RE.search(str(value)))
+
+        if not scans:
+            return True
+
+        indexed = _indexed_field_names(model)
+        candidates = [f.name for f in _condition_fields(query._where)
+                      if f.model_class is model and f.name not in indexed]
+        candidates = list(collections.OrderedDict.fromkeys(candidates))
+        for scan in scans:
+            click.echo("Full table scan: {}".format(scan.strip()))
+        if candidates:
+            click.echo("Consider indexing {} ({}).".format(
+                model._meta.name, ", ".join(candidates)))
+        else:
+            click.echo("No filter on {} can use an index.".format(
+                model._meta.name))
+        return False
+
+    @classmethod
+    def model_command(cls, model, name, base_fields=None):
+        """
+        Build the `click` command `name` (one of `MODEL_COMMANDS`) over
+        `model`, as in the README example. `base_fields` are the fields shown
+        by `list`, all of them by default.
+
+        """
+        force = click.option("--force", is_flag=True,
+                             help="Don't ask for confirmation.")
+        explain_option = click.option(
+            "--explain", is_flag=True,
+            help="Print the query plan instead of running the query.")
+        stats_option = _compose([
+            click.option("--stats", type=click.Choice(["text", "json"]),
+                         help=("Print timings, statements, rows and peak "
+                               "memory on stderr.")),
+            click.option("--trace-memory", is_flag=True,
+                         help=("With --stats, also trace the memory "
+                               "allocated by Python. Slow.")),
+        ])
+        verbose_name = model._meta.name
+
+        if name == "create":
+            @click.command("create",
+                           help="Creates a new {}.".format(verbose_name))
+            @force
+            @stats_option
+            @cls.click_options_from_model_fields(model)
+            def command(force, stats, trace_memory, **fields):
+                with cls.instrument(model, stats, trace_memory):
+                    return cls.create(model, force, **fields)
+        elif name == "show":
+            @click.command("show",
+                           help="Shows {} information.".format(verbose_name))
+            @click.argument("primary_keys", metavar="[PRIMARY_KEY]...",
+                            nargs=-1)
+            @click.option("--from-file", type=click.File("r"),
+                          help=("Also show the primary keys read from this "
+                                "file, one per line. Use - for stdin."))
+            @click.option("fmt", "--format",
+                          type=click.Choice(cls.OUTPUT_FORMATS),
+                          default="table", help="Output format.")
+            @explain_option
+            @stats_option
+            def command(primary_keys, from_file, fmt, explain, stats,
+                        trace_memory):
+                pks = list(primary_keys)
+                if from_file is not None:
+                    pks += cls.pks_from_file(from_file)
+                if not pks:
+                    raise click.UsageError("No primary key given.")
+
+                with cls.instrument(model, stats, trace_memory):
+                    if len(pks) == 1 and from_file is None:
+                        return cls.show(model, pks[0], fmt=fmt,
+                                        explain=explain)
+                    if explain:
+                        raise click.UsageError(
+                            "--explain takes a single primary key.")
+                    return cls.show_many(model, pks, fmt=fmt)
+        elif name == "update":
+            @click.command("update",
+                           help="Updates {} information.".format(
+                               verbose_name))
+            @click.argument("primary_key")
+            @force
+            @explain_option
+            @stats_option
+            @cls.click_options_from_model_fields(model)
+            def command(primary_key, force, explain, stats, trace_memory,
+                        **changed_fields):
+                with cls.instrument(model, stats, trace_memory):
+                    return cls.update(model, primary_key, force,
+                                      explain=explain, **changed_fields)
+        elif name == "delete":
+            @click.command("delete",
+                           help="Deletes an existing {}.".format(
+                               verbose_name))
+            @click.argument("primary_key")
+            @force
+            @stats_option
+            def command(primary_key, force, stats, trace_memory):
+                with cls.instrument(model, stats, trace_memory):
+                    return cls.delete(model, primary_key, force)
+        elif name == "list":
+            if base_fields is None:
+                base_fields = _field_names(model)
+
+            @click.command("list", help="Enumerate {}.".format(verbose_name))
+            @click.option("fields", "--add-field", multiple=True,
+                          help="Shows a custom field in the result")
+            @cls.click_list_options()
+            def command(fields, **options):
+                return cls.list(model, base_fields, extra_fields=fields,
+                                **options)
+        else:
+            raise ValueError("Unknown command {!r}".format(name))
+
+        return command
+
+    @classmethod
+    def group_command(cls, group, name):
+        """
+        Build the `click` command `name` (one of `GROUP_COMMANDS`) running
+        commands of `group`, a `CRUDLGroup`, in the same process.
+
+        """
+        if name == "shell":
+            @click.command("shell",
+                           help=("Run commands read line by line, reusing "
+                                 "the connection and the built commands."))
+            def command():
+                interactive = sys.stdin.isatty()
+                while True:
+                    if interactive:
+                        click.echo("> ", nl=False)
+                    line = sys.stdin.readline()
+                    if not line or line.strip() in ("exit", "quit"):
+                        break
+                    try:
+                        group.run_line(line)
+                    except click.ClickException as exc:
+                        exc.show()
+                    except click.Abort:
+                        click.echo("Aborted!", err=True)
+                    except Exception as exc:
+                        # Database errors, malformed keys... only end the
+                        # command of this line.
+                        click.echo("Error: {}".format(
+                            str(exc) or exc.__class__.__name__), err=True)
+        elif name == "dump":
+            @click.command("dump",
+                           help=("Export the rows of MODELS, all of them by "
+                                 "default, to one file per model, several "
+                                 "models at a time."))
+            @click.argument("names", metavar="[MODELS]...", nargs=-1)
+            @click.option("--output-dir", default=".",
+                          type=click.Path(file_okay=False),
+                          help="Directory of the files.")
+            @click.option("fmt", "--format", default="jsonl",
+                          type=click.Choice(cls.OUTPUT_FORMATS[1:]),
+                          help="Format of the files.")
+            @click.option("--workers", type=click.IntRange(min=1),
+                          help=("Number of models exported at a time "
+                                "[default: {}].".format(cls.DUMP_WORKERS)))
+            @click.option("state", "--since-last", metavar="STATE",
+                          type=click.Path(dir_okay=False),
+                          help=("Only export the rows past the watermarks "
+                                "stored in the STATE file by the previous "
+                                "run, and update them."))
+            @click.option("--watermark", metavar="FIELD",
+                          help=("Field only growing with new rows used as "
+                                "watermark [default: primary key]."))
+            def command(names, output_dir, fmt, workers, state, watermark):
+                names = names or list(group.model_groups)
+                unknown = [n for n in names if n not in group.model_groups]
+                if unknown:
+                    raise click.BadParameter(
+                        "Unknown models: {}".format(", ".join(unknown)))
+                models = collections.OrderedDict(
+                    (n, group.model_groups[n].model) for n in names)
+                return cls.dump(models, output_dir, fmt=fmt, workers=workers,
+                                state=state, watermark=watermark)
+        elif name == "export":
+            @click.command("export",
+                           help=("Export the rows of MODEL to OUTPUT, "
+                                 "splitting them in primary key ranges "
+                                 "exported by several processes."))
+            @click.argument("model_name", metavar="MODEL")
+            @click.argument("output", type=click.Path(dir_okay=False))
+            @click.option("fmt", "--format", default="jsonl",
+                          type=click.Choice(cls.OUTPUT_FORMATS[1:]),
+                          help="Format of the output.")
+            @click.option("--workers", type=click.IntRange(min=1),
+                          help="Number of processes [default: CPUs].")
+            @click.option("--partitions", type=click.IntRange(min=1),
+                          help=("Number of primary key ranges [default: "
+                                "workers]."))
+            @click.option("--split", default="minmax",
+                          type=click.Choice(["minmax", "quantiles"]),
+                          help=("Split the keys evenly between MIN and MAX, "
+                                "or by row count. Keys that aren't integers "
+                                "are always split by row count."))
+            @click.option("--merge/--shards", default=True,
+                          help=("Join the ranges in OUTPUT, in key order, or "
+                                "keep one file per range."))
+            @click.option("--where", multiple=True,
+                          help="Filter rows with FIELD<op>VALUE.")
+            def command(model_name, output, **options):
+                model_group = group.model_groups.get(model_name)
+                if model_group is None:
+                    raise click.BadParameter(
+                        "Unknown model {}".format(model_name),
+                        param_hint="MODEL")
+                return cls.export_partitioned(model_group.model, output,
+                                              spec=model_group.spec,
+                                              **options)
+        elif name == "batch":
+            @click.command("batch",
+                           help=("Run the command lines of SCRIPT in one "
+                                 "process and transaction, rolling back on "
+                                 "the first error."))
+            @click.argument("script", type=click.File("r"))
+            @click.option("--commit-every", type=click.IntRange(min=1),
+                          metavar="N",
+                          help=("Commit every N commands instead of once at "
+                                "the end."))
+            def command(script, commit_every):
+                return group.run_lines(script, commit_every=commit_every)
+        else:
+            raise ValueError("Unknown command {!r}".format(name))
 
-        # Using function composition we compose all the decorators generated by
-        # `_options_from_model` and we return one that groups them all.
-        return lambda f: functools.reduce(lambda g, h: h(g),
-                                          _options_from_model(),
-                                          f)
+        return command
 
-    @staticmethod
-    def fields_from_options(options):
-        null_fields = {k[:-len('_set_null')]: None
-                       for k, v in options.items()
-                       if k.endswith('_set_null') and v}
+    @classmethod
+    def group(cls, models, list_fields=None, **attrs):
+        """
+        Return a `click` group with a subgroup of create, show, update,
+        delete and list commands per model. Models and commands are resolved
+        and built only when invoked, so the startup time doesn't depend on
+        the number of models. The group also has the `GROUP_COMMANDS` (see
+        `group_command`).
 
-        non_null_fields = {k: v for k, v in options.items()
-                           if not k.endswith('_set_null') and v is not None}
+        :param models: Models by subgroup name. Each one can be the model
+                       itself, an import path in the form
+                       ``package.module:Model`` or a callable returning it.
+        :type models: dict
 
-        return collections.ChainMap(null_fields, non_null_fields)
+        :param list_fields: Base fields shown by `list`, by subgroup name.
+        :type list_fields: dict
+
+        """
+        return CRUDLGroup(models, list_fields=list_fields, crudl=cls,
+                          **attrs)
 
     @classmethod
+    @_invalidates()
     def create(cls, model, force, **options):
         """
         C: CREATE
@@ -179,7 +1623,11 @@ class CRUDL:
             # non auto-incremental ID.
             obj.save(force_insert=True)
             click.echo("The following entry was created:")
-            cls.show(model, obj.get_id())
+            if cls.VERIFY_WRITES:
+                cls.show(model, obj.get_id())
+            else:
+                cls.print_table(cls.format_single_element(
+                    obj, sorted(model._meta.fields.keys())))
             return True
 
         if force:
@@ -198,12 +1646,172 @@ class CRUDL:
             if click.confirm("Are you sure?"):
                 return _create()
 
+    @staticmethod
+    def _column_converters(model, columns):
+        """
+        Return a function per column converting its text values to the type
+        of the model field, as `click_options_from_model_fields` does.
+
+        """
+        converters = []
+        for name in columns:
+            field = model._meta.fields.get(name)
+            if field is None:
+                raise click.BadParameter(
+                    "{!r} is not a field of {}".format(name, model._meta.name))
+
+            type_ = _click_type(model, field)
+            param_type = None if type_ is None else \
+                click.types.convert_type(type_)
+
+            def _convert(value, field=field, param_type=param_type):
+                if not isinstance(value, str):
+                    return value
+                if value == "" and field.null:
+                    return None
+                if param_type is None:
+                    return value
+                return param_type.convert(value, None, None)
+
+            converters.append(_convert)
+        return converters
+
+    @classmethod
+    def _read_rows(cls, model, source, fmt):
+        """
+        Yield the rows of the CSV or JSON Lines `source` as dicts with their
+        values converted to the model field types.
+
+        """
+        if fmt == "csv":
+            reader = csv.reader(source)
+            columns = next(reader, [])
+            lines = reader
+        elif fmt == "jsonl":
+            lines = (json.loads(line) for line in source if line.strip())
+            first = next(lines, None)
+            if first is None:
+                return
+            columns = list(first)
+            lines = itertools.chain([first], lines)
+        else:
+            raise click.BadParameter("Unknown format {!r}".format(fmt))
+
+        converters = cls._column_converters(model, columns)
+        for number, line in enumerate(lines, start=1):
+            if fmt == "jsonl":
+                if set(line) != set(columns):
+                    line = None
+                else:
+                    line = [line[c] for c in columns]
+            elif not line:
+                continue
+            elif len(line) != len(columns):
+                line = None
+
+            if line is None:
+                raise click.BadParameter(
+                    "Entry {} doesn't have the columns {}".format(
+                        number, columns))
+            yield {c: convert(v)
+                   for c, convert, v in zip(columns, converters, line)}
+
+    @classmethod
+    @_invalidates()
+    def bulk_create(cls, model, source, fmt="csv", batch_size=None):
+        """
+        C: CREATE, in bulk
+
+        Insert every row of the CSV (with a header line) or JSON Lines file
+        `source` using one multi-row INSERT per `batch_size` rows, each one
+        in its own transaction.
+
+        """
+        batch_size = batch_size or cls.BULK_BATCH_SIZE
+        database = model._meta.database
+        rows = cls._read_rows(model, source, fmt)
+
+        start = time.perf_counter()
+        created = 0
+        for batch in _chunked(rows, batch_size):
+            if isinstance(database, peewee.SqliteDatabase):
+                # SQLite limits the number of parameters per statement.
+                # Besides the columns of the file, peewee inserts the
+                # fields with a default value.
+                size = max(1, SQLITE_MAX_VARIABLES // len(model._meta.fields))
+            else:
+                size = len(batch)
+            with database.atomic():
+                for chunk in _chunked(batch, size):
+                    model.insert_many(chunk).execute()
+            created += len(batch)
+        elapsed = time.perf_counter() - start
+
+        click.echo("Created {} entries in {:.2f}s ({:.0f} rows/sec).".format(
+            created, elapsed, created / elapsed if elapsed else 0))
+        return True
+
+    @staticmethod
+    def pks_from_file(source):
+        """
+        Read primary keys from `source`, one per line, ignoring blank lines.
+
+        """
+        return [line.strip() for line in source if line.strip()]
+
+    @classmethod
+    def _pk_batches(cls, model, pks, batch_size):
+        """
+        Split `pks` in batches usable in a single `pk IN (...)` condition.
+
+        """
+        pk = model._meta.primary_key
+        if isinstance(pk, peewee.CompositeKey):
+            raise click.UsageError(
+                "Bulk operations by primary key are not supported on "
+                "composite primary keys.")
+
+        batch_size = batch_size or cls.BULK_BATCH_SIZE
+        if isinstance(model._meta.database, peewee.SqliteDatabase):
+            # SQLite limits the number of parameters per statement, leave
+            # some room for the rest of the query.
+            batch_size = min(batch_size, SQLITE_MAX_VARIABLES // 2)
+        return [(pk << batch) for batch in _chunked(pks, batch_size)]
+
+    @classmethod
+    def _preview_many(cls, model, conditions):
+        """
+        Print how many records match any of `conditions` and a small sample
+        of them. Return the number of matching records.
+
+        """
+        count = sum(model.select().where(c).count() for c in conditions)
+        click.echo("{} records match, for instance:".format(count))
+
+        fields = sorted(model._meta.fields.keys())
+        sample = []
+        for condition in conditions:
+            if len(sample) >= cls.BULK_PREVIEW_SIZE:
+                break
+            sample.extend(model.select().where(condition)
+                          .limit(cls.BULK_PREVIEW_SIZE - len(sample)))
+        data = cls.format_multiple_elements(sample, fields)
+        cls.print_table(data, headers=fields)
+        return count
+
     @classmethod
-    def show(cls, model, pk):
+    @_cached()
+    def show(cls, model, pk, fmt="table", explain=False):
         """
         R: READ
 
+        With `explain` the query plan is printed instead (see `explain`).
+
         """
+        if explain:
+            return cls.explain(model, model.select().where(
+                model._meta.primary_key == pk).limit(1))
+
         fields = sorted(model._meta.fields.keys())
         try:
             # We get the key through meta, as it could be a compose key
@@ -212,15 +1820,66 @@ class CRUDL:
             click.echo("Registry {} does not exists.".format(pk))
             return False
         else:
-            data = cls.format_single_element(obj, fields)
-            cls.print_table(data)
+            if fmt == "table":
+                data = cls.format_single_element(obj, fields)
+                cls.print_table(data)
+            else:
+                cls.print_rows(cls.iter_element_values([obj], fields),
+                               fields, fmt)
             return True
 
     @classmethod
-    def update(cls, model, pk, force, **options):
+    def show_many(cls, model, pks, batch_size=None, fmt="table"):
+        """
+        R: READ, several records
+
+        Fetch the records whose primary keys are in `pks` with one
+        `WHERE pk IN (...)` query per batch and print them as a single
+        table, in the given order. Missing keys are reported afterwards.
+
+        """
+        # Convert the keys as the database would, so "01" and 1 are the same
+        # key, and remove duplicates keeping the order and the given text.
+        pk_field = model._meta.primary_key
+        keys = collections.OrderedDict()
+        for given in pks:
+            key = given
+            if not isinstance(pk_field, peewee.CompositeKey):
+                try:
+                    key = pk_field.python_value(pk_field.db_value(given))
+                except (TypeError, ValueError):
+                    raise click.BadParameter(
+                        "{!r} is not a primary key of {}".format(
+                            given, model._meta.name))
+            keys.setdefault(key, given)
+        fields = sorted(model._meta.fields.keys())
+
+        found = {}
+        for condition in cls._pk_batches(model, list(keys), batch_size):
+            for obj in _fetching(model.select().where(condition)):
+                found[obj._get_pk_value()] = obj
+
+        objs = [found[key] for key in keys if key in found]
+        if fmt != "table":
+            cls.print_rows(cls.iter_element_values(objs, fields), fields, fmt)
+        elif objs:
+            data = cls.format_multiple_elements(objs, fields)
+            cls.print_table(data, headers=fields)
+
+        missing = [given for key, given in keys.items() if key not in found]
+        for pk in missing:
+            click.echo("Registry {} does not exists.".format(pk))
+        return not missing
+
+    @classmethod
+    @_invalidates()
+    def update(cls, model, pk, force, explain=False, **options):
         """
         U: UPDATE
 
+        With `explain` the plan of the update is printed instead of running
+        it (see `explain`).
+
         """
         changes = cls.fields_from_options(options)
 
@@ -228,27 +1887,101 @@ class CRUDL:
             click.echo("Nothing to change.")
             return False
 
-        def _update():
+        if explain:
+            return cls.explain(model, model.update(**changes).where(
+                model._meta.primary_key == pk))
+
+        def _update(obj=None):
             # We get the key through meta, as it could be a compose key
             records = (model.update(**changes)
                             .where(model._meta.primary_key == pk)
                             .execute())
 
             click.echo("Changed {} records.".format(records))
-            cls.show(model, pk)
+            if cls.VERIFY_WRITES:
+                cls.show(model, pk)
+            elif records and obj is not None:
+                # Render the previewed record merged with the changes.
+                for name, value in changes.items():
+                    field = model._meta.fields.get(name)
+                    if field is not None and value is not None:
+                        value = field.python_value(field.db_value(value))
+                    setattr(obj, name, value)
+                cls.print_table(cls.format_single_element(
+                    obj, sorted(model._meta.fields.keys())))
+            elif records:
+                pk_name = model._meta.primary_key.name
+                cls.print_table([[pk_name, pk]] +
+                                [[k, v] for k, v in changes.items()])
             return records > 0
 
         if force:
             return _update()
         else:
             click.echo("You are about to update the following record:")
-            cls.show(model, pk)
+            try:
+                # We get the key through meta, as it could be a compose key
+                obj = model.get(model._meta.primary_key == pk)
+            except model.DoesNotExist:
+                click.echo("Registry {} does not exists.".format(pk))
+                obj = None
+            else:
+                cls.print_table(cls.format_single_element(
+                    obj, sorted(model._meta.fields.keys())))
+            click.echo("With the following information:")
+            cls.print_table([[k, v] for k, v in changes.items()])
+            if click.confirm("Are you sure?"):
+                return _update(obj)
+
+    @classmethod
+    @_invalidates()
+    def bulk_update(cls, model, force, pks=None, where=None, batch_size=None,
+                    **options):
+        """
+        U: UPDATE, in bulk
+
+        Update either the records whose primary keys are in `pks`, with one
+        `UPDATE ... WHERE pk IN (...)` per batch, or the records matching the
+        `where` filters (see `where_from_options`) with a single `UPDATE`.
+
+        """
+        one_and_only_one({'pks': pks, 'where': where or None}, 'pks', 'where')
+
+        changes = cls.fields_from_options(options)
+        if not changes:
+            click.echo("Nothing to change.")
+            return False
+
+        if pks is not None:
+            conditions = cls._pk_batches(model, pks, batch_size)
+        else:
+            conditions = [cls.where_from_options(model, where)]
+
+        def _update():
+            records = 0
+            for condition in conditions:
+                with model._meta.database.atomic():
+                    records += (model.update(**changes)
+                                     .where(condition)
+                                     .execute())
+
+            click.echo("Changed {} records.".format(records))
+            return records > 0
+
+        if force:
+            return _update()
+        else:
+            click.echo("You are about to update several records.")
+            if not cls._preview_many(model, conditions):
+                return False
             click.echo("With the following information:")
             cls.print_table([[k, v] for k, v in changes.items()])
             if click.confirm("Are you sure?"):
                 return _update()
+            return False
 
     @classmethod
+    @_invalidates(cascade=True)
     def delete(cls, model, pk, force):
         """
         D: DELETE
@@ -275,19 +2008,612 @@ class CRUDL:
                 return False
 
     @classmethod
-    def list(cls, model, base_fields, extra_fields=None):
+    def _where_batches(cls, model, condition, batch_size):
+        """
+        Yield conditions matching the records that match `condition`, one
+        primary key range of at most `batch_size` records at a time. Every
+        range is computed when the previous one has been processed.
+
+        """
+        pk = model._meta.primary_key
+        if isinstance(pk, peewee.CompositeKey):
+            raise click.UsageError(
+                "Bulk operations by primary key are not supported on "
+                "composite primary keys.")
+
+        query = (model.select(pk).where(condition).order_by(pk)
+                 .limit(batch_size or cls.BULK_BATCH_SIZE).tuples())
+        last = None
+        while True:
+            page = query if last is None else query.where(pk > last)
+            keys = [row[0] for row in page]
+            if not keys:
+                return
+            yield condition & (pk >= keys[0]) & (pk <= keys[-1])
+            last = keys[-1]
+
+    @classmethod
+    @_invalidates(cascade=True)
+    def bulk_delete(cls, model, force, pks=None, where=None, batch_size=None,
+                    delete_nullable=True):
+        """
+        D: DELETE, in bulk
+
+        Delete either the records whose primary keys are in `pks` or those
+        matching the `where` filters (see `where_from_options`), together
+        with their dependents. The dependency graph is computed once and
+        every batch issues one set-based DELETE (or UPDATE ... SET NULL for
+        nullable foreign keys, unless `delete_nullable`) per dependent table.
+
+        """
+        one_and_only_one({'pks': pks, 'where': where or None}, 'pks', 'where')
+
+        steps = _delete_plan(model, delete_nullable)
+
+        def _delete_batch(condition):
+            nodes = []
+            for fk, parent in steps:
+                parent_condition = condition if parent is None \
+                    else nodes[parent]
+                nodes.append(fk << (fk.rel_model.select(fk.to_field)
+                                    .where(parent_condition)))
+
+            for (fk, _), node in reversed(list(zip(steps, nodes))):
+                dependent = fk.model_class
+                if fk.null and not delete_nullable:
+                    dependent.update(**{fk.name: None}).where(node).execute()
+                else:
+                    dependent.delete().where(node).execute()
+            return model.delete().where(condition).execute()
+
+        def _delete():
+            if pks is not None:
+                conditions = cls._pk_batches(model, pks, batch_size)
+            else:
+                conditions = cls._where_batches(
+                    model, cls.where_from_options(model, where), batch_size)
+
+            records = 0
+            for condition in conditions:
+                with model._meta.database.atomic():
+                    records += _delete_batch(condition)
+
+            click.echo("Removed {} records.".format(records))
+            return records > 0
+
+        if force:
+            return _delete()
+        else:
+            click.echo("You are about to remove several records.")
+            if pks is not None:
+                conditions = cls._pk_batches(model, pks, batch_size)
+            else:
+                conditions = [cls.where_from_options(model, where)]
+            if cls._preview_many(model, conditions) and \
+                    click.confirm("Are you sure?"):
+                return _delete()
+            return False
+
+    @classmethod
+    def aggregate(cls, model, group_by=(), aggregates=("count", ), where=None,
+                  fmt="table", explain=False):
+        """
+        L: LIST, aggregated
+
+        Run a single `GROUP BY` query over `model` computing `aggregates`
+        (``count`` or ``<function>:FIELD``, see `AGGREGATES`) for every
+        distinct value of the `group_by` fields, or for the whole table if
+        there are none. With `explain` its plan is printed instead.
+
+        """
+        aggregates = list(aggregates or ("count", ))
+        group_fields = []
+        for name in group_by:
+            field = model._meta.fields.get(name.replace('-', '_'))
+            if field is None:
+                raise click.BadParameter(
+                    "{!r} is not a field of {}".format(name, model._meta.name),
+                    param_hint="--group-by")
+            group_fields.append(field)
+
+        expressions = []
+        for aggregate in aggregates:
+            function, _, name = aggregate.partition(':')
+            if function not in AGGREGATES or \
+                    (not name and function != "count"):
+                raise click.BadParameter(
+                    "{!r} is not count or <function>:FIELD".format(aggregate),
+                    param_hint="--agg")
+            if not name:
+                expressions.append(peewee.fn.COUNT(peewee.SQL('*')))
+                continue
+
+            field = model._meta.fields.get(name.replace('-', '_'))
+            if field is None:
+                raise click.BadParameter(
+                    "{!r} is not a field of {}".format(name, model._meta.name),
+                    param_hint="--agg")
+            expression = AGGREGATES[function](field)
+            if function in ("avg", "count"):
+                # Don't convert counts and averages with the field type, it
+                # would truncate the averages of integer fields.
+                expression = expression.coerce(False)
+            expressions.append(expression)
+
+        query = model.select(*(group_fields + expressions))
+        condition = cls.where_from_options(model, where)
+        if condition is not None:
+            query = query.where(condition)
+        if group_fields:
+            query = query.group_by(*group_fields).order_by(*group_fields)
+        if explain:
+            return cls.explain(model, query)
+        rows = _fetching(query.tuples().iterator())
+
+        headers = [f.name for f in group_fields] + aggregates
+        if fmt == "table":
+            data = cls.format_tuples(list(rows), range(len(headers)))
+            cls.print_table(data, headers=headers)
+        else:
+            cls.print_rows(rows, headers, fmt)
+        return True
+
+    @classmethod
+    @_cached(bounded=lambda options: options.get("limit") is not None or
+             any(options.get(name) for name in ("count", "group_by", "agg")))
+    def list(cls, model, base_fields, extra_fields=None, stream=False,
+             limit=None, after=None, page_size=None, where=None,
+             fmt="table", count=False, group_by=(), agg=(), stats=None,
+             trace_memory=False, explain=False):
         """
         L: LIST
 
+        With `stream` the rows are read with a server-side cursor and printed
+        in chunks of `STREAM_CHUNK_SIZE`, keeping memory usage constant.
+
+        `limit`, `after` and `page_size` paginate the rows by primary key (see
+        `_KeysetCursor`), and `where` filters them in the database (see
+        `where_from_options`).
+
+        Formats other than `table` are always streamed (see `print_rows`).
+
+        `count`, `group_by` and `agg` show aggregates computed by the
+        database instead of the rows (see `aggregate`).
+
+        `stats` and `trace_memory` print where the time went on stderr (see
+        `instrument`), and `explain` the plan of the query, or of its first
+        page, instead of the rows (see `explain`).
+
         """
-        # We concatenate base fields with extra_fields, removing duplicates
-        # and keeping the order.
-        fields = list(base_fields)
-        if extra_fields is not None:
-            fields += list(extra_fields)
-        fields = [f for f, _ in itertools.groupby(fields)]
+        with cls.instrument(model, stats, trace_memory):
+            if count or group_by or agg:
+                return cls.aggregate(model, group_by=group_by,
+                                     aggregates=agg or ("count", ),
+                                     where=where, fmt=fmt,
+                                     explain=explain)
 
-        objs = model.select()
-        data = cls.format_multiple_elements(objs, fields)
-        cls.print_table(data, headers=fields)
+            # We concatenate base fields with extra_fields, removing duplicates
+            # and keeping the order.
+            fields = list(base_fields)
+            if extra_fields is not None:
+                fields += list(extra_fields)
+            fields = [f for f, _ in itertools.groupby(fields)]
+
+            # Only fetch the columns that are going to be displayed.
+            columns = _projection(model, fields)
+            if columns is None:
+                objs = model.select()
+                key = None
+
+                def _format(elems):
+                    return cls.format_multiple_elements(elems, fields)
+
+                def _values(elems):
+                    return cls.iter_element_values(elems, fields)
+            else:
+                # Fast path: plain tuples instead of model instances.
+                objs = model.select(*columns).tuples()
+                # The primary key is always the first column.
+                key = operator.itemgetter(0)
+                names = [c.name for c in columns]
+                indices = [names.index(f) for f in fields]
+
+                def _format(rows):
+                    return cls.format_tuples(rows, indices)
+
+                def _values(rows):
+                    return ([row[i] for i in indices] for row in rows)
+
+            condition = cls.where_from_options(model, where)
+            if condition is not None:
+                objs = objs.where(condition)
+
+            cursor = None
+            paginated = (limit is not None or after is not None or
+                         page_size is not None)
+            if paginated:
+                pk = model._meta.primary_key
+                if isinstance(pk, peewee.CompositeKey):
+                    raise click.UsageError(
+                        "Pagination is not supported on composite primary "
+                        "keys.")
+                cursor = _KeysetCursor(objs, pk, after=after, limit=limit,
+                                       page_size=page_size, key=key)
+
+            if explain:
+                if cursor is not None:
+                    sizes = [size for size in (limit, page_size)
+                             if size is not None]
+                    objs = cursor.page(min(sizes) if sizes else None)
+                return cls.explain(model, objs)
+
+            if cursor is not None:
+                objs = cursor
+            elif stream or fmt != "table":
+                objs = objs.iterator()
+            objs = _fetching(objs)
+
+            if fmt != "table":
+                cls.print_rows(_values(objs), fields, fmt)
+            elif stream:
+                chunks = (_format(chunk)
+                          for chunk in _chunked(objs, cls.STREAM_CHUNK_SIZE))
+                cls.print_table_stream(chunks, headers=fields, model=model)
+            else:
+                data = _format(objs)
+                cls.print_table(data, headers=fields)
+
+            if cursor is not None and cursor.count == limit:
+                click.echo("Next page: --after {}".format(cursor.last_key),
+                           err=True)
+            return True
+
+    @classmethod
+    def export(cls, model, file, fields=None, fmt="jsonl", where=None,
+               condition=None):
+        """
+        Write the rows of `model` matching `where` (see `where_from_options`)
+        and the peewee expression `condition` to `file` in the machine
+        readable format `fmt`, in primary key order, streaming them from the
+        database as plain tuples (see `print_rows`). `fields` are all the
+        model fields by default.
+
+        Return the number of rows written.
+
+        """
+        fields = list(fields or _field_names(model))
+        columns = _projection(model, fields)
+        if columns is None:
+            raise click.BadParameter(
+                "Only fields of {} can be exported".format(model._meta.name))
+        names = [c.name for c in columns]
+        indices = [names.index(f) for f in fields]
+
+        query = model.select(*columns).order_by(
+            *[model._meta.fields[name] for name in _primary_key_names(model)])
+        for expression in (cls.where_from_options(model, where), condition):
+            if expression is not None:
+                query = query.where(expression)
+
+        rows = ([row[i] for i in indices]
+                for row in _fetching(query.tuples().iterator()))
+        return cls.print_rows(rows, fields, fmt, file=file)
+
+    @classmethod
+    def export_since(cls, model, file, since=None, field=None, fmt="jsonl",
+                     where=None):
+        """
+        Export the rows of `model` whose watermark `field` (by default the
+        primary key) is greater than `since`, all of them if it is `None`
+        (see `export`).
+
+        The highest value of `field` is read before exporting and only rows
+        up to it are exported, so rows written meanwhile are left for the
+        next run. The field must only grow, like an auto-incremental key or
+        an ``updated_at`` timestamp.
+
+        Return the number of rows exported and the new watermark, `since` if
+        there were no rows.
+
+        """
+        if field is None:
+            watermark = model._meta.primary_key
+            if isinstance(watermark, peewee.CompositeKey):
+                raise click.UsageError(
+                    "Incremental exports need a watermark field on "
+                    "composite primary keys.")
+        else:
+            watermark = model._meta.fields.get(field.replace('-', '_'))
+            if watermark is None:
+                raise click.BadParameter(
+                    "{!r} is not a field of {}".format(field,
+                                                       model._meta.name),
+                    param_hint="--watermark")
+
+        condition = cls.where_from_options(model, where)
+        if since is not None:
+            since = watermark.python_value(since)
+            past = watermark > since
+            condition = past if condition is None else condition & past
+
+        query = model.select(peewee.fn.MAX(watermark))
+        if condition is not None:
+            query = query.where(condition)
+        high = query.scalar(convert=True)
+        if high is None:
+            # Nothing new: only write the headers, if any.
+            upto = peewee.SQL("1 = 0")
+        else:
+            upto = watermark <= high
+        condition = upto if condition is None else condition & upto
+
+        rows = cls.export(model, file, fmt=fmt, condition=condition)
+        return rows, since if high is None else high
+
+    @classmethod
+    def dump(cls, models, directory, fmt="jsonl", workers=None, state=None,
+             watermark=None):
+        """
+        Export every model of `models`, a dict of models by name, to the
+        file ``<name>.<fmt>`` of `directory` (see `export`), `workers` models
+        (`DUMP_WORKERS` by default) at a time, each one in its own thread and
+        with its own connection. Databases must keep a connection per thread,
+        as peewee ones do by default.
+
+        With a `state` file only the rows past the watermark stored in it by
+        the previous run are exported, and the new watermarks are stored
+        once all the models are done (see `export_since`). `watermark` is
+        the field used, the primary key by default.
+
+        A summary of the rows and throughput per model is printed when all
+        of them are done.
+
+        """
+        os.makedirs(directory, exist_ok=True)
+        watermarks = _load_watermarks(state) if state is not None else {}
+
+        def _dump(name, model):
+            path = os.path.join(directory, "{}.{}".format(name, fmt))
+            database = model._meta.database
+            start = time.perf_counter()
+            try:
+                with open(path, "w", encoding="utf-8", newline="") as file:
+                    if state is None:
+                        rows, high = cls.export(model, file, fmt=fmt), None
+                    else:
+                        rows, high = cls.export_since(
+                            model, file, since=watermarks.get(name),
+                            field=watermark, fmt=fmt)
+            finally:
+                # Release the connection of this worker thread.
+                if not database.is_closed():
+                    database.close()
+            return rows, time.perf_counter() - start, high
+
+        with concurrent.futures.ThreadPoolExecutor(
+                max_workers=workers or cls.DUMP_WORKERS) as executor:
+            futures = collections.OrderedDict(
+                (name, executor.submit(_dump, name, model))
+                for name, model in models.items())
+
+        summary = []
+        failed = []
+        for name, future in futures.items():
+            try:
+                rows, elapsed, high = future.result()
+            except (peewee.DatabaseError, OSError) as exc:
+                failed.append(name)
+                summary.append([name, "Error: {}".format(exc), "", ""])
+            else:
+                summary.append([name, rows, "{:.3f}".format(elapsed),
+                                "{:.0f}".format(rows / elapsed)
+                                if elapsed else ""])
+                if high is not None:
+                    # Dates and the like are kept in their database format.
+                    watermarks[name] = high if isinstance(
+                        high, (int, float, str)) else str(high)
+        cls.print_table(summary, headers=["model", "rows", "seconds",
+                                          "rows/s"])
+
+        if state is not None:
+            _save_watermarks(state, watermarks)
+
+        if failed:
+            raise click.ClickException("Failed to dump {}.".format(
+                ", ".join(failed)))
         return True
+
+    @classmethod
+    def export_partitioned(cls, model, output, partitions=None, workers=None,
+                           fmt="jsonl", where=None, split="minmax",
+                           merge=True, spec=None):
+        """
+        Export the rows of `model` matching `where` splitting them in
+        `partitions` primary key ranges (see `_pk_ranges`), each one
+        exported to its own shard file by one of `workers` processes. Both
+        default to the number of CPUs.
+
+        Shards are named after `output` with the number of the range before
+        the extension (``table.0003.jsonl``). With `merge` they are joined
+        into `output` in key order and removed.
+
+        Worker processes are started from scratch and import the model again,
+        so it must be importable: `spec` may be given as an import path in the
+        form ``package.module:Model`` (see `group`). With a single worker the
+        ranges are exported in this process.
+
+        Return the number of rows exported.
+
+        """
+        if isinstance(model._meta.primary_key, peewee.CompositeKey):
+            raise click.UsageError(
+                "Partitioned exports are not supported on composite primary "
+                "keys.")
+
+        workers = workers or os.cpu_count() or 1
+        ranges = _pk_ranges(model, partitions or workers,
+                            cls.where_from_options(model, where), split)
+        root, extension = os.path.splitext(output)
+        paths = ["{}.{:04d}{}".format(root, number, extension)
+                 for number in range(len(ranges))]
+        tasks = [(cls, model if spec is None else spec, path, fmt, where,
+                  low, high)
+                 for path, (low, high) in zip(paths, ranges)]
+
+        if workers == 1:
+            counts = [_export_range(task) for task in tasks]
+        else:
+            context = multiprocessing.get_context("spawn")
+            with context.Pool(min(workers, len(tasks))) as pool:
+                counts = pool.map(_export_range, tasks, chunksize=1)
+
+        if merge:
+            with open(output, "wb") as merged:
+                for number, path in enumerate(paths):
+                    with open(path, "rb") as shard:
+                        if number and fmt in ("csv", "tsv"):
+                            # Keep only the headers of the first shard.
+                            shard.readline()
+                        shutil.copyfileobj(shard, merged)
+                    os.remove(path)
+
+        cls.print_table(
+            [[path, low, high, count]
+             for path, (low, high), count in zip(paths, ranges, counts)],
+            headers=["shard", "from", "to", "rows"])
+        return sum(counts)
+
+
+class _ModelGroup(click.MultiCommand):
+    """
+    CRUDL commands over one model, resolving the model and building each
+    command the first time it is needed.
+
+    """
+    def __init__(self, name, spec, base_fields=None, crudl=CRUDL, **attrs):
+        attrs.setdefault("short_help", "CRUDL over {}.".format(name))
+        super().__init__(name, **attrs)
+        self.spec = spec
+        self.base_fields = base_fields
+        self.crudl = crudl
+        self._model = None
+        self._commands = {}
+
+    @property
+    def model(self):
+        if self._model is None:
+            self._model = _resolve_model(self.spec)
+        return self._model
+
+    def list_commands(self, ctx):
+        return list(self.crudl.MODEL_COMMANDS)
+
+    def get_command(self, ctx, name):
+        if name not in self.crudl.MODEL_COMMANDS:
+            return None
+        if name not in self._commands:
+            self._commands[name] = self.crudl.model_command(
+                self.model, name, base_fields=self.base_fields)
+        return self._commands[name]
+
+
+class CRUDLGroup(click.MultiCommand):
+    """
+    `click` group with one lazy `_ModelGroup` per model. See `CRUDL.group`.
+
+    """
+    def __init__(self, models, list_fields=None, crudl=CRUDL, **attrs):
+        super().__init__(attrs.pop("name", None), **attrs)
+        list_fields = list_fields or {}
+        self.crudl = crudl
+        self.model_groups = collections.OrderedDict(
+            (name, _ModelGroup(name, spec,
+                               base_fields=list_fields.get(name),
+                               crudl=crudl))
+            for name, spec in models.items())
+        self._commands = {}
+
+    def list_commands(self, ctx):
+        return list(self.model_groups) + [
+            name for name in self.crudl.GROUP_COMMANDS
+            if name not in self.model_groups]
+
+    def get_command(self, ctx, name):
+        if name in self.model_groups:
+            return self.model_groups[name]
+        if name not in self.crudl.GROUP_COMMANDS:
+            return None
+        if name not in self._commands:
+            self._commands[name] = self.crudl.group_command(self, name)
+        return self._commands[name]
+
+    def run_line(self, line):
+        """
+        Run a command line of the group, like ``mock show 1``, in this
+        process. Blank lines and ``#`` comments are ignored. Errors are
+        raised instead of exiting.
+
+        """
+        args = shlex.split(line, comments=True)
+        if not args:
+            return None
+        if args[0] in self.crudl.GROUP_COMMANDS and \
+                args[0] not in self.model_groups:
+            raise click.UsageError(
+                "{} can't be run from another command.".format(args[0]))
+        try:
+            with self.make_context(self.name or "crudl", args) as ctx:
+                return self.invoke(ctx)
+        except SystemExit:
+            # --help and friends
+            return None
+
+    def run_lines(self, lines, commit_every=None):
+        """
+        Run the command lines in `lines` (see `run_line`) inside a
+        transaction on the database of every model used, committed at the
+        end or every `commit_every` commands. The first command raising an
+        error or returning a false value rolls back the current transaction
+        and raises `click.ClickException`.
+
+        Return the number of commands run.
+
+        """
+        run = 0
+        with contextlib.ExitStack() as transactions:
+            databases = []
+            for number, line in enumerate(lines, 1):
+                args = shlex.split(line, comments=True)
+                if not args:
+                    continue
+
+                model_group = self.model_groups.get(args[0])
+                if model_group is not None:
+                    database = model_group.model._meta.database
+                    if not any(database is d for d in databases):
+                        transactions.enter_context(database.atomic())
+                        databases.append(database)
+
+                try:
+                    result = self.run_line(line)
+                except click.ClickException as exc:
+                    message = exc.format_message()
+                except click.Abort:
+                    message = "Aborted!"
+                except Exception as exc:
+                    # Database errors, malformed keys...
+                    message = "{}.".format(str(exc) or
+                                           exc.__class__.__name__)
+                else:
+                    message = None if result else "{} failed.".format(
+                        " ".join(args))
+                if message is not None:
+                    raise click.ClickException(
+                        "Line {}: {} Changes since the last commit were "
+                        "rolled back.".format(number, message))
+
+                run += 1
+                if commit_every is not None and run % commit_every == 0:
+                    transactions.close()
+                    databases = []
+        return run
@@ -0,0 +1,31 @@
+import peewee
+import pytest
+
+
+def make_models(number, database=None):
+    """
+    Return `number` distinct models with a handful of fields each.
+    """
+    database = database or peewee.SqliteDatabase(":memory:")
+    models = []
+    for i in range(number):
+        class Meta:
+            pass
+        Meta.database = database
+        attrs = {
+            'Meta': Meta,
+            'text_attr': peewee.TextField(),
+            'char_attr': peewee.CharField(max_length=32),
+            'int_attr': peewee.IntegerField(),
+            'bool_attr': peewee.BooleanField(),
+            'float_attr': peewee.FloatField(null=True),
+            'date_attr': peewee.DateField(null=True),
+        }
+        models.append(type('BenchModel{}'.format(i), (peewee.Model, ),
+                           attrs))
+    return models
+
+
+@pytest.fixture(scope="session")
+def bench_models():
+    return make_models
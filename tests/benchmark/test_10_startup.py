@@ -0,0 +1,57 @@
+import time
+
+from click.testing import CliRunner
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+
+MODELS = 300
+
+
+def _timed(func, repeat=3):
+    """
+    Best wall time of `repeat` calls to `func`.
+    """
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def test_lazy_group_startup_doesnt_depend_on_models(benchmark, bench_models):
+    """
+    Este benchmark mide `--help` sobre un `CRUDL.group` con muchos modelos,
+    guarda en `extra_info` cuántas veces es más rápido que construir sus
+    comandos, que es lo que el grupo pagaba antes al importarse, y comprueba
+    que sigue siendo claramente más rápido
+    """
+
+    from peewee2click import CRUDL
+
+    eager_models = bench_models(MODELS)
+    lazy_models = bench_models(MODELS)
+
+    def eager():
+        for model in eager_models:
+            for name in CRUDL.MODEL_COMMANDS:
+                CRUDL.model_command(model, name)
+
+    def lazy():
+        cli = CRUDL.group({m.__name__: m for m in lazy_models})
+        result = CliRunner().invoke(cli, ["--help"])
+        assert result.exit_code == 0
+
+    eager_time = _timed(eager)
+    lazy_time = _timed(lazy)
+    print("eager: {:.3f}s lazy: {:.3f}s".format(eager_time, lazy_time))
+
+    benchmark.extra_info["eager_seconds"] = eager_time
+    benchmark.extra_info["speedup"] = eager_time / lazy_time
+    benchmark(lazy)
+
+    # Far below the usual speedup, so that noise doesn't fail it but
+    # resolving the models on startup again does.
+    assert lazy_time * 3 < eager_time
@@ -0,0 +1,66 @@
+import os
+import time
+
+import peewee
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+
+ROWS = int(os.environ.get("PEEWEE2CLICK_BENCHMARK_ROWS", 1000000))
+
+
+def _chunks(rows):
+    from peewee2click import CRUDL, _chunked
+    return _chunked(rows, CRUDL.STREAM_CHUNK_SIZE)
+
+
+@pytest.mark.slow
+def test_tuples_fast_path_is_faster_than_models(benchmark, tmpdir,
+                                                bench_models):
+    """
+    Este benchmark mide el formateo de `ROWS` filas obtenidas como tuplas con
+    `format_tuples` y guarda en `extra_info` cuántas veces es más rápido que
+    instanciar un modelo por fila y formatearlo con
+    `format_multiple_elements`
+    """
+
+    from peewee2click import CRUDL
+
+    database = peewee.SqliteDatabase(str(tmpdir.join("bench.db")))
+    model, = bench_models(1, database)
+    model.create_table()
+    with database.atomic():
+        database.get_conn().executemany(
+            "INSERT INTO {} (text_attr, char_attr, int_attr, bool_attr, "
+            "float_attr) VALUES ('text', 'char', 1, 1, 1.5)".format(
+                model._meta.db_table),
+            ([] for _ in range(ROWS)))
+
+    fields = ['id', 'char_attr', 'int_attr', 'bool_attr', 'float_attr']
+
+    start = time.perf_counter()
+    for chunk in _chunks(model.select().iterator()):
+        CRUDL.format_multiple_elements(chunk, fields)
+    models_time = time.perf_counter() - start
+
+    columns = [getattr(model, f) for f in fields]
+
+    def tuples():
+        for chunk in _chunks(model.select(*columns).tuples().iterator()):
+            CRUDL.format_tuples(chunk, range(len(fields)))
+
+    start = time.perf_counter()
+    tuples()
+    tuples_time = time.perf_counter() - start
+
+    print("{} rows: models {:.2f}s ({:.0f} rows/s), tuples {:.2f}s "
+          "({:.0f} rows/s), {:.1f}x".format(
+              ROWS, models_time, ROWS / models_time, tuples_time,
+              ROWS / tuples_time, models_time / tuples_time))
+
+    # A single run of each is too noisy for a ratio to assert on; compare
+    # the recorded speedup across benchmark runs instead.
+    benchmark.extra_info["models_rows_per_second"] = ROWS / models_time
+    benchmark.extra_info["speedup"] = models_time / tuples_time
+    benchmark.pedantic(tuples, rounds=1)
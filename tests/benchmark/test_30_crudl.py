@@ -0,0 +1,171 @@
+"""
+Benchmarks of the CRUDL operations over a local SQLite file, at several
+table sizes. Run them with ``tox -e benchmark`` or::
+
+    py.test tests/benchmark --benchmark-json=benchmark.json
+
+Besides the timings, `extra_info` records the number of SQL statements,
+the peak memory allocated by Python and the throughput of each operation.
+"""
+from unittest.mock import patch
+import os
+import random
+import tracemalloc
+
+import peewee
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+
+SIZES = [
+    1000,
+    100000,
+    pytest.param(1000000, marks=pytest.mark.slow),
+]
+FIELDS = ['id', 'text_attr', 'char_attr', 'int_attr', 'bool_attr',
+          'float_attr']
+
+
+@pytest.fixture(scope="module", params=SIZES)
+def table(request, tmpdir_factory, bench_models):
+    """
+    A model over a SQLite file with `request.param` rows.
+    """
+    rows = request.param
+    path = tmpdir_factory.mktemp("benchmark").join("{}.db".format(rows))
+    database = peewee.SqliteDatabase(str(path))
+    model, = bench_models(1, database)
+    model.create_table()
+    with database.atomic():
+        database.get_conn().executemany(
+            "INSERT INTO {} (text_attr, char_attr, int_attr, bool_attr, "
+            "float_attr) VALUES (?, 'char', ?, 1, 1.5)".format(
+                model._meta.db_table),
+            (("text {}".format(i), i) for i in range(rows)))
+    yield model, rows
+    database.close()
+
+
+@pytest.fixture
+def devnull():
+    """
+    Discard everything the commands print.
+    """
+    with open(os.devnull, "w") as null:
+        def _echo(message=None, file=None, nl=True, err=False, color=None):
+            null.write("{}{}".format(message or "", "\n" if nl else ""))
+
+        with patch("peewee2click.click.echo", _echo):
+            yield
+
+
+def _measure(benchmark, model, func, rows=1, setup=None):
+    """
+    Run `func` once counting its SQL statements and peak memory, then
+    benchmark it and record the throughput in rows per second. `setup`,
+    if given, returns the arguments of every call of `func`.
+    """
+    args, kwargs = setup() if setup else ((), {})
+    database = model._meta.database
+    with patch.object(database, "execute_sql",
+                      side_effect=database.execute_sql) as execute_mock:
+        tracemalloc.start()
+        try:
+            func(*args, **kwargs)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+    benchmark.extra_info["queries"] = execute_mock.call_count
+    benchmark.extra_info["peak_memory_kb"] = peak // 1024
+
+    if setup:
+        benchmark.pedantic(func, setup=setup, rounds=100)
+    else:
+        benchmark(func)
+    # There are no stats with --benchmark-disable.
+    stats = getattr(benchmark.stats, "stats", None)
+    if stats is not None and stats.mean:
+        benchmark.extra_info["rows_per_second"] = rows / stats.mean
+
+
+def _random_pk(rows):
+    return random.randint(1, rows)
+
+
+def test_benchmark_create(benchmark, table, devnull):
+    from peewee2click import CRUDL
+
+    model, _ = table
+    _measure(benchmark, model, lambda: CRUDL.create(
+        model, True, text_attr="new", char_attr="new", int_attr=1,
+        bool_attr=True))
+
+
+def test_benchmark_show(benchmark, table, devnull):
+    from peewee2click import CRUDL
+
+    model, rows = table
+    _measure(benchmark, model, lambda: CRUDL.show(model, _random_pk(rows)))
+
+
+def test_benchmark_update(benchmark, table, devnull):
+    from peewee2click import CRUDL
+
+    model, rows = table
+    _measure(benchmark, model, lambda: CRUDL.update(
+        model, _random_pk(rows), True, int_attr=-1))
+
+
+def test_benchmark_delete(benchmark, table, devnull):
+    from peewee2click import CRUDL
+
+    model, _ = table
+
+    def _setup():
+        obj = model.create(text_attr="del", char_attr="del", int_attr=0,
+                           bool_attr=False)
+        return (model, obj.id, True), {}
+
+    _measure(benchmark, model, CRUDL.delete, setup=_setup)
+
+
+@pytest.mark.parametrize("kwargs", [
+    {},
+    {"stream": True},
+    {"fmt": "jsonl"},
+    {"limit": 100, "after": 100},
+    {"count": True},
+], ids=lambda kwargs: ",".join(sorted(kwargs)) or "table")
+def test_benchmark_list(benchmark, table, devnull, kwargs):
+    from peewee2click import CRUDL
+
+    model, rows = table
+    if not kwargs and rows > 100000:
+        pytest.skip("The tabulate path keeps the whole table in memory.")
+
+    # The create and delete benchmarks change the size of the table.
+    rows = model.select().count()
+    listed = 1 if kwargs.get("count") else min(kwargs.get("limit", rows),
+                                               rows)
+    benchmark.group = "list-{}".format(rows)
+    _measure(benchmark, model, lambda: CRUDL.list(model, FIELDS, **kwargs),
+             rows=listed)
+
+
+@pytest.mark.parametrize("cached", [False, True], ids=["cold", "cached"])
+def test_benchmark_click_options_from_model_fields(benchmark, bench_models,
+                                                   cached):
+    from peewee2click import CRUDL
+
+    def _setup():
+        model, = bench_models(1)
+        if cached:
+            CRUDL.click_options_from_model_fields(model)
+        return (model, ), {}
+
+    def _build(model):
+        return CRUDL.click_options_from_model_fields(model)(lambda: None)
+
+    benchmark.pedantic(_build, setup=_setup, rounds=200)
@@ -680,3 +680,1396 @@ def test_max_one_raises_UsageError_when_more_than_one_param():
     ctx = {'foo': 'foo', 'bar': 'bar'}
     with pytest.raises(click.UsageError):
         max_one(ctx, 'foo', 'bar')
+
+
+def test_list_method_streams_rows_in_chunks(crudl_mock_model):
+    """
+    Este test comprueba que el método `list` con `stream=True` lee los objetos
+    con un cursor y los imprime en bloques de `STREAM_CHUNK_SIZE` filas
+    mediante `print_table_stream`
+    """
+
+    from peewee2click import CRUDL
+
+    for i in range(5):
+        crudl_mock_model.create(text_attr="mock%d" % i, char_attr="",
+                                int_attr=i, bool_attr=True)
+
+    printed = []
+
+    def consume(chunks, headers, model):
+        printed.extend(list(chunk) for chunk in chunks)
+
+    print_func = 'peewee2click.CRUDL.print_table_stream'
+    with patch.object(CRUDL, 'STREAM_CHUNK_SIZE', 2), \
+            patch(print_func, side_effect=consume) as print_mock:
+        assert CRUDL.list(crudl_mock_model, ['int_attr'], stream=True)
+
+    print_mock.assert_called_once_with(ANY, headers=['int_attr'],
+                                       model=crudl_mock_model)
+    assert printed == [[['0'], ['1']], [['2'], ['3']], [['4']]]
+
+
+def test_print_table_stream_prints_headers_only_once():
+    """
+    Este test comprueba que el método `print_table_stream` imprime las
+    cabeceras solo con el primer bloque de filas
+    """
+
+    from peewee2click import CRUDL
+
+    runner = CliRunner()
+
+    @click.command()
+    def click_func():
+        CRUDL.print_table_stream(iter([[[1, 2]], [[3, 4]]]),
+                                 headers=['foo', 'bar'])
+
+    result = runner.invoke(click_func)
+    assert result.output.count('foo') == 1
+    assert '1' in result.output and '4' in result.output
+
+
+def test_print_table_stream_prints_headers_when_no_rows():
+    """
+    Este test comprueba que el método `print_table_stream` imprime las
+    cabeceras aunque no haya filas
+    """
+
+    from peewee2click import CRUDL
+
+    runner = CliRunner()
+
+    @click.command()
+    def click_func():
+        CRUDL.print_table_stream(iter([]), headers=['foo', 'bar'])
+
+    result = runner.invoke(click_func)
+    assert 'foo' in result.output
+
+
+def test_list_method_selects_only_requested_columns(crudl_mock_model):
+    """
+    Este test comprueba que el método `list` solo pide a la base de datos las
+    columnas de los campos solicitados y la clave primaria
+    """
+
+    from peewee2click import CRUDL
+
+    format_func = 'peewee2click.CRUDL.format_tuples'
+    with patch(format_func) as format_mock, \
+            patch('peewee2click.CRUDL.print_table'):
+        CRUDL.list(crudl_mock_model, ['int_attr'], extra_fields=['char_attr'])
+
+    query = format_mock.call_args[0][0]
+    sql, _ = query.sql()
+    assert '"int_attr"' in sql and '"char_attr"' in sql and '"id"' in sql
+    assert '"text_attr"' not in sql and '"float_attr"' not in sql
+
+
+def test_list_method_selects_all_columns_when_non_field_requested(
+        crudl_mock_model):
+    """
+    Este test comprueba que el método `list` obtiene la fila completa cuando
+    alguno de los campos solicitados no es una columna del modelo
+    """
+
+    from peewee2click import CRUDL
+
+    crudl_mock_model.some_property = property(lambda self: self.int_attr * 2)
+    crudl_mock_model.create(text_attr="mock", char_attr="", int_attr=21,
+                            bool_attr=True)
+
+    print_func = 'peewee2click.CRUDL.print_table'
+    with patch(print_func) as print_mock:
+        CRUDL.list(crudl_mock_model, ['some_property'])
+
+    print_mock.assert_called_once_with([['42']], headers=['some_property'])
+
+
+@pytest.mark.parametrize('kwargs,expected', [
+    ({'limit': 2}, [['1'], ['2']]),
+    ({'after': 3}, [['4'], ['5']]),
+    ({'after': 1, 'limit': 2}, [['2'], ['3']]),
+    ({'page_size': 2}, [['1'], ['2'], ['3'], ['4'], ['5']]),
+    ({'page_size': 2, 'limit': 3}, [['1'], ['2'], ['3']]),
+])
+def test_list_method_paginates_by_primary_key(crudl_mock_model, kwargs,
+                                              expected):
+    """
+    Este test comprueba que el método `list` pagina los resultados por clave
+    primaria con los parámetros `limit`, `after` y `page_size`
+    """
+
+    from peewee2click import CRUDL
+
+    for i in range(5):
+        crudl_mock_model.create(text_attr="mock", char_attr="", int_attr=i,
+                                bool_attr=True)
+
+    print_func = 'peewee2click.CRUDL.print_table'
+    with patch(print_func) as print_mock:
+        CRUDL.list(crudl_mock_model, ['id'], **kwargs)
+
+    print_mock.assert_called_once_with(expected, headers=['id'])
+
+
+def test_list_method_uses_keyset_instead_of_offset(crudl_mock_model):
+    """
+    Este test comprueba que el método `list` obtiene cada página filtrando
+    por la última clave primaria vista en lugar de usar OFFSET
+    """
+
+    from peewee2click import CRUDL
+
+    for i in range(5):
+        crudl_mock_model.create(text_attr="mock", char_attr="", int_attr=i,
+                                bool_attr=True)
+
+    database = crudl_mock_model._meta.database
+    execute_sql = database.execute_sql
+    with patch.object(database, 'execute_sql',
+                      side_effect=execute_sql) as execute_mock, \
+            patch('peewee2click.CRUDL.print_table'):
+        CRUDL.list(crudl_mock_model, ['id'], page_size=2)
+
+    queries = [c[0][0] for c in execute_mock.call_args_list]
+    assert len(queries) == 3
+    assert not any('OFFSET' in q for q in queries)
+    assert all('LIMIT 2' in q for q in queries)
+    assert [c[0][1] for c in execute_mock.call_args_list] == [[], [2], [4]]
+
+
+def test_list_method_prints_next_page_hint(crudl_mock_model):
+    """
+    Este test comprueba que el método `list` indica cómo obtener la siguiente
+    página cuando se alcanza el límite de filas
+    """
+
+    from peewee2click import CRUDL
+
+    for i in range(3):
+        crudl_mock_model.create(text_attr="mock", char_attr="", int_attr=i,
+                                bool_attr=True)
+
+    echo_func = 'peewee2click.click.echo'
+    with patch(echo_func) as echo_mock, \
+            patch('peewee2click.CRUDL.print_table'):
+        CRUDL.list(crudl_mock_model, ['id'], limit=2)
+
+    echo_mock.assert_called_once_with("Next page: --after 2", err=True)
+
+
+@pytest.mark.parametrize('where,expected', [
+    (['int_attr=1'], [['1']]),
+    (['int_attr>=1'], [['1'], ['2']]),
+    (['int_attr<2', 'bool_attr=false'], [['0']]),
+    (['char-attr!=b'], [['0'], ['2']]),
+    (['float_attr=NULL'], [['1'], ['2']]),
+    (['float_attr!=NULL'], [['0']]),
+])
+def test_list_method_filters_rows_in_database(crudl_mock_model, where,
+                                              expected):
+    """
+    Este test comprueba que el método `list` filtra las filas con los filtros
+    del parámetro `where`, convirtiendo los valores al tipo de cada campo
+    """
+
+    from peewee2click import CRUDL
+
+    crudl_mock_model.create(text_attr="mock", char_attr="a", int_attr=0,
+                            bool_attr=False, float_attr=1.5)
+    crudl_mock_model.create(text_attr="mock", char_attr="b", int_attr=1,
+                            bool_attr=True)
+    crudl_mock_model.create(text_attr="mock", char_attr="c", int_attr=2,
+                            bool_attr=True)
+
+    print_func = 'peewee2click.CRUDL.print_table'
+    with patch(print_func) as print_mock:
+        CRUDL.list(crudl_mock_model, ['int_attr'], where=where)
+
+    print_mock.assert_called_once_with(expected, headers=['int_attr'])
+
+
+@pytest.mark.parametrize('where', [
+    ['int_attr'],
+    ['unknown_attr=1'],
+    ['int_attr=notanumber'],
+])
+def test_where_from_options_raises_BadParameter_on_invalid_filters(
+        crudl_mock_model, where):
+    """
+    Este test comprueba que el método `where_from_options` eleva
+    `click.BadParameter` cuando un filtro está mal formado, se refiere a un
+    campo inexistente o su valor no es del tipo del campo
+    """
+
+    from peewee2click import CRUDL
+
+    with pytest.raises(click.BadParameter):
+        CRUDL.where_from_options(crudl_mock_model, where)
+
+
+def test_where_from_options_returns_None_without_filters(crudl_mock_model):
+    """
+    Este test comprueba que el método `where_from_options` devuelve `None`
+    cuando no se le pasan filtros
+    """
+
+    from peewee2click import CRUDL
+
+    assert CRUDL.where_from_options(crudl_mock_model, ()) is None
+
+
+@pytest.mark.parametrize('fmt,content', [
+    ('csv', ('text_attr,char_attr,int_attr,bool_attr,float_attr\n'
+             'a,x,1,true,\n'
+             'b,y,2,false,2.5\n'
+             'c,z,3,true,\n')),
+    ('jsonl', ('{"text_attr": "a", "char_attr": "x", "int_attr": 1, '
+               '"bool_attr": true, "float_attr": null}\n'
+               '{"text_attr": "b", "char_attr": "y", "int_attr": "2", '
+               '"bool_attr": false, "float_attr": 2.5}\n'
+               '\n'
+               '{"text_attr": "c", "char_attr": "z", "int_attr": 3, '
+               '"bool_attr": true, "float_attr": null}\n')),
+])
+def test_bulk_create_method_inserts_rows_in_batches(crudl_mock_model, fmt,
+                                                    content):
+    """
+    Este test comprueba que el método `bulk_create` inserta en base de datos
+    todas las filas de un fichero CSV o JSON Lines convirtiendo sus valores
+    al tipo de cada campo, con un INSERT por cada lote de filas
+    """
+
+    import io
+    from peewee2click import CRUDL
+
+    database = crudl_mock_model._meta.database
+    execute_sql = database.execute_sql
+    with patch.object(database, 'execute_sql',
+                      side_effect=execute_sql) as execute_mock:
+        assert CRUDL.bulk_create(crudl_mock_model, io.StringIO(content),
+                                 fmt=fmt, batch_size=2)
+
+    inserts = [c for c in execute_mock.call_args_list
+               if c[0][0].startswith('INSERT')]
+    assert len(inserts) == 2
+    rows = list(crudl_mock_model.select().order_by(crudl_mock_model.id)
+                .tuples())
+    assert [r[1:] for r in rows] == [
+        ('a', 'x', None, 1, True, None),
+        ('b', 'y', None, 2, False, 2.5),
+        ('c', 'z', None, 3, True, None),
+    ]
+
+
+def test_bulk_create_method_counts_defaulted_fields_in_sqlite_batches():
+    """
+    Este test comprueba que el método `bulk_create` no pasa de
+    `SQLITE_MAX_VARIABLES` parámetros por INSERT contando también los campos
+    con valor por defecto, que peewee añade a cada fila
+    """
+
+    import io
+    from peewee import CharField, IntegerField, Model, SqliteDatabase
+    from peewee2click import CRUDL, SQLITE_MAX_VARIABLES
+
+    sqlite_db = SqliteDatabase(":memory:")
+
+    class Defaulted(Model):
+        name = CharField()
+        first = IntegerField(default=1)
+        second = IntegerField(default=lambda: 2)
+
+        class Meta:
+            database = sqlite_db
+
+    sqlite_db.create_tables([Defaulted])
+    content = "name\n" + "".join("n{}\n".format(i) for i in range(1000))
+
+    execute_sql = sqlite_db.execute_sql
+    with patch.object(sqlite_db, 'execute_sql',
+                      side_effect=execute_sql) as execute_mock:
+        assert CRUDL.bulk_create(Defaulted, io.StringIO(content),
+                                 batch_size=1000)
+
+    inserts = [c for c in execute_mock.call_args_list
+               if c[0][0].startswith('INSERT')]
+    assert all(len(c[0][1]) <= SQLITE_MAX_VARIABLES for c in inserts)
+    assert Defaulted.select().where(Defaulted.second == 2).count() == 1000
+
+
+@pytest.mark.parametrize('content', [
+    'unknown_attr\n1\n',
+    'int_attr\nnotanumber\n',
+    'text_attr,int_attr\na\n',
+])
+def test_bulk_create_method_raises_BadParameter_on_invalid_rows(
+        crudl_mock_model, content):
+    """
+    Este test comprueba que el método `bulk_create` eleva
+    `click.BadParameter` cuando una columna no es un campo del modelo, un
+    valor no es del tipo del campo o una fila no tiene todas las columnas
+    """
+
+    import io
+    from peewee2click import CRUDL
+
+    with pytest.raises(click.BadParameter):
+        CRUDL.bulk_create(crudl_mock_model, io.StringIO(content))
+
+
+def test_bulk_update_method_updates_pks_in_batches(crudl_mock_model):
+    """
+    Este test comprueba que el método `bulk_update` actualiza los objetos
+    cuyas claves primarias se le pasan con un UPDATE por cada lote de claves
+    """
+
+    from peewee2click import CRUDL
+
+    for i in range(5):
+        crudl_mock_model.create(text_attr="mock", char_attr="", int_attr=i,
+                                bool_attr=True)
+
+    database = crudl_mock_model._meta.database
+    execute_sql = database.execute_sql
+    with patch.object(database, 'execute_sql',
+                      side_effect=execute_sql) as execute_mock:
+        assert CRUDL.bulk_update(crudl_mock_model, True,
+                                 pks=['1', '2', '4'], batch_size=2,
+                                 text_attr="new")
+
+    updates = [c for c in execute_mock.call_args_list
+               if c[0][0].startswith('UPDATE')]
+    assert len(updates) == 2
+    assert [o.id for o in crudl_mock_model.select().where(
+        crudl_mock_model.text_attr == "new")] == [1, 2, 4]
+
+
+def test_bulk_update_method_updates_filtered_rows(crudl_mock_model):
+    """
+    Este test comprueba que el método `bulk_update` actualiza los objetos
+    que cumplen los filtros del parámetro `where` con un único UPDATE
+    """
+
+    from peewee2click import CRUDL
+
+    for i in range(5):
+        crudl_mock_model.create(text_attr="mock", char_attr="", int_attr=i,
+                                bool_attr=True)
+
+    assert CRUDL.bulk_update(crudl_mock_model, True, where=['int_attr>=3'],
+                             float_attr_set_null=True, bool_attr=False)
+    assert [o.id for o in crudl_mock_model.select().where(
+        crudl_mock_model.bool_attr == False)] == [4, 5]
+
+
+@pytest.mark.parametrize('kwargs', [
+    {},
+    {'pks': ['1'], 'where': ['int_attr=1']},
+])
+def test_bulk_update_method_requires_pks_or_where(crudl_mock_model, kwargs):
+    """
+    Este test comprueba que el método `bulk_update` eleva
+    `click.UsageError` si no se le pasa exactamente uno de los parámetros
+    `pks` y `where`
+    """
+
+    from peewee2click import CRUDL
+
+    with pytest.raises(click.UsageError):
+        CRUDL.bulk_update(crudl_mock_model, True, text_attr="new", **kwargs)
+
+
+def test_bulk_update_method_previews_count_and_sample(crudl_mock_model):
+    """
+    Este test comprueba que el método `bulk_update` sin `force` muestra el
+    número de objetos afectados y solo una muestra de ellos antes de pedir
+    confirmación
+    """
+
+    from peewee2click import CRUDL
+
+    for i in range(10):
+        crudl_mock_model.create(text_attr="mock", char_attr="", int_attr=i,
+                                bool_attr=True)
+
+    print_func = 'peewee2click.CRUDL.print_table'
+    with patch('peewee2click.click.confirm', return_value=False), \
+            patch('peewee2click.click.echo') as echo_mock, \
+            patch(print_func) as print_mock, \
+            patch.object(CRUDL, 'BULK_PREVIEW_SIZE', 3):
+        assert not CRUDL.bulk_update(crudl_mock_model, False,
+                                     where=['int_attr>=2'], text_attr="new")
+
+    echo_mock.assert_any_call("8 records match, for instance:")
+    assert len(print_mock.call_args_list[0][0][0]) == 3
+    assert not crudl_mock_model.select().where(
+        crudl_mock_model.text_attr == "new").exists()
+
+
+@pytest.fixture
+def crudl_related_models():
+    from peewee import (ForeignKeyField, IntegerField, Model,
+                        SqliteDatabase)
+
+    sqlite_db = SqliteDatabase(":memory:")
+
+    class Parent(Model):
+        value = IntegerField()
+
+        class Meta:
+            database = sqlite_db
+
+    class Child(Model):
+        parent = ForeignKeyField(Parent)
+
+        class Meta:
+            database = sqlite_db
+
+    class GrandChild(Model):
+        child = ForeignKeyField(Child)
+
+        class Meta:
+            database = sqlite_db
+
+    class NullableChild(Model):
+        parent = ForeignKeyField(Parent, null=True)
+
+        class Meta:
+            database = sqlite_db
+
+    sqlite_db.create_tables([Parent, Child, GrandChild, NullableChild])
+
+    for value in range(4):
+        parent = Parent.create(value=value)
+        child = Child.create(parent=parent)
+        GrandChild.create(child=child)
+        NullableChild.create(parent=parent)
+
+    return Parent, Child, GrandChild, NullableChild
+
+
+@pytest.mark.parametrize('kwargs', [
+    {'pks': ['2', '3']},
+    {'where': ['value>=1', 'value<=2']},
+])
+def test_bulk_delete_method_deletes_records_and_dependents(
+        crudl_related_models, kwargs):
+    """
+    Este test comprueba que el método `bulk_delete` elimina los objetos
+    seleccionados y, recursivamente, los que dependen de ellos
+    """
+
+    from peewee2click import CRUDL
+
+    Parent, Child, GrandChild, NullableChild = crudl_related_models
+
+    assert CRUDL.bulk_delete(Parent, True, batch_size=1, **kwargs)
+
+    assert [p.id for p in Parent.select()] == [1, 4]
+    assert [c.parent_id for c in Child.select()] == [1, 4]
+    assert [g.child.parent_id for g in GrandChild.select()] == [1, 4]
+    assert [n.parent_id for n in NullableChild.select()] == [1, 4]
+
+
+def test_bulk_delete_method_sets_null_when_not_delete_nullable(
+        crudl_related_models):
+    """
+    Este test comprueba que el método `bulk_delete` con
+    `delete_nullable=False` pone a NULL las claves foráneas nulables que
+    apuntan a los objetos eliminados en lugar de eliminar sus objetos
+    """
+
+    from peewee2click import CRUDL
+
+    Parent, Child, GrandChild, NullableChild = crudl_related_models
+
+    CRUDL.bulk_delete(Parent, True, pks=['1'], delete_nullable=False)
+
+    assert [n.parent_id for n in NullableChild.select()] == [None, 2, 3, 4]
+
+
+def test_bulk_delete_method_issues_one_query_per_table_and_batch(
+        crudl_related_models):
+    """
+    Este test comprueba que el método `bulk_delete` lanza una única sentencia
+    por cada tabla dependiente y lote, independientemente del número de
+    objetos eliminados
+    """
+
+    from peewee2click import CRUDL
+
+    Parent, Child, GrandChild, NullableChild = crudl_related_models
+
+    database = Parent._meta.database
+    execute_sql = database.execute_sql
+    with patch.object(database, 'execute_sql',
+                      side_effect=execute_sql) as execute_mock:
+        CRUDL.bulk_delete(Parent, True, pks=['1', '2', '3', '4'])
+
+    statements = [c[0][0] for c in execute_mock.call_args_list
+                  if c[0][0].startswith(('DELETE', 'UPDATE'))]
+    assert len(statements) == 4
+
+
+def test_bulk_delete_method_doesnt_delete_when_confirm_is_false(
+        crudl_related_models):
+    """
+    Este test comprueba que el método `bulk_delete` no elimina nada cuando la
+    respuesta a `click.confirm` es False
+    """
+
+    from peewee2click import CRUDL
+
+    Parent, Child, GrandChild, NullableChild = crudl_related_models
+
+    with patch('peewee2click.click.confirm', return_value=False):
+        assert not CRUDL.bulk_delete(Parent, False, where=['value>=0'])
+    assert Parent.select().count() == 4
+
+
+def test_list_method_doesnt_fetch_foreign_keys_per_row(crudl_mock_model):
+    """
+    Este test comprueba que el método `list` muestra el id de las claves
+    foráneas sin lanzar una consulta por cada fila para obtener el objeto
+    relacionado
+    """
+
+    from peewee2click import CRUDL
+
+    parent = crudl_mock_model.create(text_attr="mock", char_attr="",
+                                     int_attr=0, bool_attr=True)
+    for i in range(5):
+        crudl_mock_model.create(text_attr="mock", char_attr="", int_attr=i,
+                                bool_attr=True, fk_attr=parent)
+
+    database = crudl_mock_model._meta.database
+    execute_sql = database.execute_sql
+    print_func = 'peewee2click.CRUDL.print_table'
+    with patch.object(database, 'execute_sql',
+                      side_effect=execute_sql) as execute_mock, \
+            patch(print_func) as print_mock:
+        CRUDL.list(crudl_mock_model, ['id', 'fk_attr'])
+
+    assert execute_mock.call_count == 1
+    print_mock.assert_called_once_with(
+        [['1', 'None']] + [[str(i), '1'] for i in range(2, 7)],
+        headers=['id', 'fk_attr'])
+
+
+def test_format_single_element_shows_foreign_key_id(crudl_mock_model):
+    """
+    Este test comprueba que el método `format_single_element` muestra el id
+    de las claves foráneas en lugar del objeto relacionado
+    """
+
+    from peewee2click import CRUDL
+
+    parent = crudl_mock_model.create(text_attr="mock", char_attr="",
+                                     int_attr=0, bool_attr=True)
+    child = crudl_mock_model.create(text_attr="mock", char_attr="",
+                                    int_attr=0, bool_attr=True,
+                                    fk_attr=parent)
+
+    child = crudl_mock_model.get(crudl_mock_model.id == child.id)
+    assert CRUDL.format_single_element(child, ['fk_attr']) == [
+        ('fk_attr', '1')]
+
+
+def _count_statements(model):
+    database = model._meta.database
+    return patch.object(database, 'execute_sql',
+                        side_effect=database.execute_sql)
+
+
+def test_create_method_doesnt_read_back_the_object(crudl_mock_model):
+    """
+    Este test comprueba que el método `create` muestra el objeto creado desde
+    memoria, con una única sentencia contra la base de datos
+    """
+
+    from peewee2click import CRUDL
+
+    with _count_statements(crudl_mock_model) as execute_mock, \
+            patch('peewee2click.CRUDL.show') as show_mock, \
+            patch('peewee2click.CRUDL.print_table') as print_mock:
+        CRUDL.create(crudl_mock_model, force=True, text_attr="mock",
+                     char_attr="", int_attr=1, bool_attr=True)
+
+    assert execute_mock.call_count == 1
+    assert not show_mock.called
+    assert ('id', '1') in print_mock.call_args[0][0]
+
+
+@pytest.mark.parametrize('force,statements,row', [
+    (True, 1, ['int_attr', 5]),
+    (False, 2, ('int_attr', '5')),
+])
+def test_update_method_doesnt_read_back_the_object(crudl_mock_model, force,
+                                                   statements, row):
+    """
+    Este test comprueba que el método `update` muestra los cambios sin volver
+    a leer el objeto de la base de datos
+    """
+
+    from peewee2click import CRUDL
+
+    crudl_mock_model.create(text_attr="mock", char_attr="", int_attr=1,
+                            bool_attr=True)
+
+    with _count_statements(crudl_mock_model) as execute_mock, \
+            patch('peewee2click.click.confirm', return_value=True), \
+            patch('peewee2click.CRUDL.show') as show_mock, \
+            patch('peewee2click.CRUDL.print_table') as print_mock:
+        CRUDL.update(crudl_mock_model, 1, force, int_attr=5)
+
+    assert execute_mock.call_count == statements
+    assert not show_mock.called
+    assert row in print_mock.call_args[0][0]
+
+
+def test_create_and_update_read_back_when_verify_writes(crudl_mock_model):
+    """
+    Este test comprueba que los métodos `create` y `update` vuelven a leer el
+    objeto con `show` cuando `VERIFY_WRITES` es True
+    """
+
+    from peewee2click import CRUDL
+
+    with patch.object(CRUDL, 'VERIFY_WRITES', True), \
+            patch('peewee2click.CRUDL.show') as show_mock:
+        CRUDL.create(crudl_mock_model, force=True, text_attr="mock",
+                     char_attr="", int_attr=1, bool_attr=True)
+        CRUDL.update(crudl_mock_model, 1, True, int_attr=5)
+
+    assert show_mock.call_count == 2
+
+
+def test_show_many_method_fetches_keys_in_batches(crudl_mock_model):
+    """
+    Este test comprueba que el método `show_many` obtiene los objetos con una
+    consulta `IN` por cada lote de claves y los imprime en una única tabla en
+    el orden dado
+    """
+
+    from peewee2click import CRUDL
+
+    for i in range(5):
+        crudl_mock_model.create(text_attr="mock", char_attr="", int_attr=i,
+                                bool_attr=True)
+
+    with _count_statements(crudl_mock_model) as execute_mock, \
+            patch('peewee2click.CRUDL.print_table') as print_mock:
+        assert CRUDL.show_many(crudl_mock_model, ['4', '1', '2', '1'],
+                               batch_size=2) is True
+
+    assert execute_mock.call_count == 2
+    rows, = print_mock.call_args[0]
+    fields = print_mock.call_args[1]['headers']
+    id_index = fields.index('id')
+    assert [row[id_index] for row in rows] == ['4', '1', '2']
+
+
+def test_show_many_method_reports_missing_keys(crudl_mock_model):
+    """
+    Este test comprueba que el método `show_many` informa de las claves que
+    no existen y devuelve False en ese caso
+    """
+
+    from peewee2click import CRUDL
+
+    crudl_mock_model.create(text_attr="mock", char_attr="", int_attr=1,
+                            bool_attr=True)
+
+    with patch('peewee2click.click.echo') as echo_mock, \
+            patch('peewee2click.CRUDL.print_table'):
+        assert CRUDL.show_many(crudl_mock_model, [1, 7, 9]) is False
+
+    echo_mock.assert_any_call("Registry 7 does not exists.")
+    echo_mock.assert_any_call("Registry 9 does not exists.")
+
+
+def test_show_many_method_normalizes_keys(crudl_mock_model):
+    """
+    Este test comprueba que el método `show_many` compara las claves
+    convertidas al tipo de la clave primaria, y rechaza las que no lo son
+    """
+
+    from peewee2click import CRUDL
+
+    crudl_mock_model.create(text_attr="mock", char_attr="", int_attr=1,
+                            bool_attr=True)
+
+    with patch('peewee2click.click.echo') as echo_mock, \
+            patch('peewee2click.CRUDL.print_table') as print_mock:
+        assert CRUDL.show_many(crudl_mock_model, ['01', 1]) is True
+
+    assert not echo_mock.called
+    assert len(print_mock.call_args[0][0]) == 1
+
+    with pytest.raises(click.BadParameter):
+        CRUDL.show_many(crudl_mock_model, ['abc'])
+
+
+def test_show_command_accepts_several_keys(crudl_mock_model, tmpdir):
+    """
+    Este test comprueba que el comando `show` generado por `model_command`
+    acepta varias claves primarias y un fichero de claves, y las muestra con
+    `show_many`
+    """
+
+    from peewee2click import CRUDL
+
+    for i in range(3):
+        crudl_mock_model.create(text_attr="mock", char_attr="", int_attr=i,
+                                bool_attr=True)
+    keys = tmpdir.join("keys.txt")
+    keys.write("3\n\n")
+
+    command = CRUDL.model_command(crudl_mock_model, "show")
+    runner = CliRunner()
+    with patch('peewee2click.CRUDL.show_many',
+               side_effect=CRUDL.show_many) as show_many_mock:
+        result = runner.invoke(command, ['1', '2', '--from-file', str(keys),
+                                         '--format', 'csv'])
+        assert result.exit_code == 0, result.output
+        assert result.output.count('mock') == 3
+        show_many_mock.assert_called_once_with(crudl_mock_model,
+                                               ['1', '2', '3'], fmt='csv')
+
+        result = runner.invoke(command, ['--from-file', '-'], input='2\n')
+        assert result.exit_code == 0, result.output
+        assert result.output.count('mock') == 1
+
+    assert runner.invoke(command, []).exit_code == 2
+
+
+def test_click_options_from_model_fields_builds_options_once(
+        crudl_mock_model):
+    """
+    Este test comprueba que el decorador click_options_from_model_fields solo
+    genera las opciones de `click` la primera vez que se usa con un modelo y
+    unos campos a omitir dados, y que las opciones generadas funcionan en
+    todos los comandos decorados
+    """
+
+    from peewee2click import CRUDL
+
+    with patch('peewee2click.click.option',
+               side_effect=click.option) as option_mock:
+        commands = []
+        calls = []
+        for _ in range(3):
+            commands.append(
+                CRUDL.click_options_from_model_fields(crudl_mock_model)(
+                    click.command()(lambda **kwargs: None)))
+            calls.append(option_mock.call_count)
+        CRUDL.click_options_from_model_fields(crudl_mock_model,
+                                              skip=['int_attr'])
+
+    assert calls[0] > 0
+    assert calls[0] == calls[1] == calls[2]
+    assert option_mock.call_count > calls[2]
+    runner = CliRunner()
+    for command in commands:
+        assert runner.invoke(command, ["--int-attr", "1"]).exit_code == 0
+
+
+@pytest.mark.parametrize('fmt,expected', [
+    ('jsonl', ('{"id": 1, "float_attr": 1.5, "bool_attr": true}\n'
+               '{"id": 2, "float_attr": null, "bool_attr": false}\n')),
+    ('csv', 'id,float_attr,bool_attr\n1,1.5,True\n2,,False\n'),
+    ('tsv', 'id\tfloat_attr\tbool_attr\n1\t1.5\tTrue\n2\t\tFalse\n'),
+])
+def test_list_method_prints_machine_readable_formats(crudl_mock_model, fmt,
+                                                     expected):
+    """
+    Este test comprueba que el método `list` imprime los objetos en formato
+    JSON Lines, CSV o TSV con sus valores nativos y sin usar `tabulate`
+    """
+
+    from peewee2click import CRUDL
+
+    crudl_mock_model.create(text_attr="mock", char_attr="", int_attr=1,
+                            bool_attr=True, float_attr=1.5)
+    crudl_mock_model.create(text_attr="mock", char_attr="", int_attr=2,
+                            bool_attr=False)
+
+    @click.command()
+    def click_func():
+        CRUDL.list(crudl_mock_model, ['id', 'float_attr', 'bool_attr'],
+                   fmt=fmt)
+
+    with patch('peewee2click.tabulate') as tabulate_mock:
+        result = CliRunner().invoke(click_func)
+
+    assert not tabulate_mock.called
+    assert result.output == expected
+
+
+def test_show_method_prints_machine_readable_formats(crudl_mock_model):
+    """
+    Este test comprueba que el método `show` imprime el objeto en formato
+    JSON Lines con sus valores nativos, con las fechas en formato ISO
+    """
+
+    import datetime
+    import json
+    from peewee2click import CRUDL
+
+    class CrudlMockModelWithDate(crudl_mock_model):
+        date_attr = DateField(null=True)
+
+    CrudlMockModelWithDate.create_table()
+    CrudlMockModelWithDate.create(text_attr="mock", char_attr="",
+                                  int_attr=1, bool_attr=True,
+                                  date_attr=datetime.date(2017, 1, 2))
+
+    @click.command()
+    def click_func():
+        CRUDL.show(CrudlMockModelWithDate, 1, fmt='jsonl')
+
+    result = CliRunner().invoke(click_func)
+
+    assert json.loads(result.output) == {
+        'id': 1, 'text_attr': 'mock', 'char_attr': '', 'fk_attr': None,
+        'int_attr': 1, 'bool_attr': True, 'float_attr': None,
+        'date_attr': '2017-01-02'}
+
+
+def test_print_table_stream_uses_widths_from_model(crudl_mock_model):
+    """
+    Este test comprueba que el método `print_table_stream` fija el ancho de
+    las columnas a partir de los metadatos del modelo, de forma que todos los
+    bloques de filas quedan alineados, alineando a la derecha las columnas
+    numéricas
+    """
+
+    from peewee2click import CRUDL
+
+    @click.command()
+    def click_func():
+        CRUDL.print_table_stream(
+            iter([[['1', "'a'"]], [['123456', "'bb'"]]]),
+            headers=['int_attr', 'char_attr'], model=crudl_mock_model)
+
+    result = CliRunner().invoke(click_func)
+    lines = result.output.strip('\n').split('\n')
+
+    # IntegerField: 11 caracteres. CharField: max_length (255) limitado a
+    # STREAM_MAX_WIDTH.
+    assert lines == [
+        '   int_attr  char_attr',
+        '          1  \'a\'',
+        '     123456  \'bb\'',
+    ]
+
+
+def test_print_table_stream_truncates_values_wider_than_first_chunk():
+    """
+    Este test comprueba que el método `print_table_stream`, sin modelo, fija
+    el ancho de las columnas con el primer bloque de filas y trunca los
+    valores más anchos de los bloques siguientes
+    """
+
+    from peewee2click import CRUDL
+
+    @click.command()
+    def click_func():
+        CRUDL.print_table_stream(iter([[["'abcdef'"]], [["'abcdefghij'"]]]),
+                                 headers=['foo'])
+
+    result = CliRunner().invoke(click_func)
+    lines = result.output.strip('\n').split('\n')
+
+    assert lines == ['foo', "'abcdef'", "'abcd..."]
+
+
+def test_print_table_stream_renders_other_formats_per_chunk():
+    """
+    Este test comprueba que el método `print_table_stream` pasa a `tabulate`
+    cada bloque de filas cuando `TABLEFMT` no es "plain" ni "simple", con
+    las cabeceras solo en el primer bloque
+    """
+
+    from peewee2click import CRUDL
+
+    class GridCRUDL(CRUDL):
+        TABLEFMT = "grid"
+
+    @click.command()
+    def click_func():
+        GridCRUDL.print_table_stream(iter([[[1, 2]], [[3, 4]]]),
+                                     headers=['foo', 'bar'])
+
+    result = CliRunner().invoke(click_func)
+    lines = result.output.strip('\n').split('\n')
+
+    assert lines == [
+        '+-------+-------+',
+        '|   foo |   bar |',
+        '+=======+=======+',
+        '|     1 |     2 |',
+        '+-------+-------+',
+        '+---+---+',
+        '| 3 | 4 |',
+        '+---+---+',
+    ]
+
+
+def test_format_tuples():
+    """
+    Este test comprueba que el método `format_tuples` formatea las columnas
+    indicadas de cada tupla con `repr` o con los formateadores dados
+    """
+
+    from peewee2click import CRUDL
+
+    rows = [(1, 'a', 1.5), (2, 'b', None)]
+
+    assert CRUDL.format_tuples(rows, [2, 1]) == [
+        ['1.5', "'a'"], ['None', "'b'"]]
+    assert CRUDL.format_tuples(rows, [0]) == [['1'], ['2']]
+    assert CRUDL.format_tuples(rows, [0, 1], [str, str.upper]) == [
+        ['1', 'A'], ['2', 'B']]
+
+
+def test_list_method_doesnt_instantiate_models_for_columns(crudl_mock_model):
+    """
+    Este test comprueba que el método `list` no construye instancias del
+    modelo cuando todos los campos solicitados son columnas
+    """
+
+    from peewee2click import CRUDL
+
+    crudl_mock_model.create(text_attr="mock", char_attr="", int_attr=1,
+                            bool_attr=True)
+
+    with patch.object(crudl_mock_model, '__init__',
+                      side_effect=AssertionError) as init_mock, \
+            patch('peewee2click.CRUDL.print_table') as print_mock:
+        CRUDL.list(crudl_mock_model, ['int_attr', 'bool_attr'])
+
+    assert not init_mock.called
+    print_mock.assert_called_once_with([['1', 'True']],
+                                       headers=['int_attr', 'bool_attr'])
+
+
+@pytest.mark.parametrize('kwargs,headers,rows', [
+    ({'count': True}, ['count'], [['5']]),
+    ({'count': True, 'where': ['int_attr>=3']}, ['count'], [['2']]),
+    ({'group_by': ['bool_attr']}, ['bool_attr', 'count'],
+     [['False', '2'], ['True', '3']]),
+    ({'group_by': ['bool_attr'], 'agg': ['sum:int_attr', 'max:int_attr',
+                                         'count:float_attr']},
+     ['bool_attr', 'sum:int_attr', 'max:int_attr', 'count:float_attr'],
+     [['False', '4', '3', '1'], ['True', '6', '4', '0']]),
+    ({'agg': ['min:int_attr']}, ['min:int_attr'], [['0']]),
+    ({'agg': ['avg:int_attr'], 'where': ['int_attr<=1']}, ['avg:int_attr'],
+     [['0.5']]),
+])
+def test_list_method_aggregates_in_database(crudl_mock_model, kwargs,
+                                            headers, rows):
+    """
+    Este test comprueba que el método `list` con los parámetros `count`,
+    `group_by` o `agg` muestra los agregados calculados por la base de datos
+    con una única consulta GROUP BY
+    """
+
+    from peewee2click import CRUDL
+
+    for i in range(5):
+        crudl_mock_model.create(text_attr="mock", char_attr="", int_attr=i,
+                                bool_attr=i % 2 == 0,
+                                float_attr=1.0 if i == 1 else None)
+
+    with _count_statements(crudl_mock_model) as execute_mock, \
+            patch('peewee2click.CRUDL.print_table') as print_mock:
+        assert CRUDL.list(crudl_mock_model, ['id'], **kwargs)
+
+    assert execute_mock.call_count == 1
+    print_mock.assert_called_once_with(rows, headers=headers)
+
+
+@pytest.mark.parametrize('fmt,output', [
+    ('csv', 'count\n5\n'),
+    ('jsonl', '{"count": 5}\n'),
+])
+def test_list_method_prints_aggregates_in_machine_readable_formats(
+        crudl_mock_model, fmt, output):
+    """
+    Este test comprueba que el método `list` con `count` imprime los
+    agregados en los formatos para máquinas
+    """
+
+    from peewee2click import CRUDL
+
+    for i in range(5):
+        crudl_mock_model.create(text_attr="mock", char_attr="", int_attr=i,
+                                bool_attr=True)
+
+    runner = CliRunner()
+    with runner.isolation() as out:
+        assert CRUDL.list(crudl_mock_model, ['id'], count=True, fmt=fmt)
+
+    assert out.getvalue().decode() == output
+
+
+@pytest.mark.parametrize('kwargs', [
+    {'group_by': ['unknown_attr']},
+    {'aggregates': ['sum']},
+    {'aggregates': ['median:int_attr']},
+    {'aggregates': ['sum:unknown_attr']},
+])
+def test_aggregate_method_raises_BadParameter_on_invalid_options(
+        crudl_mock_model, kwargs):
+    """
+    Este test comprueba que el método `aggregate` eleva `click.BadParameter`
+    cuando se le pasan campos inexistentes o agregados desconocidos
+    """
+
+    from peewee2click import CRUDL
+
+    with pytest.raises(click.BadParameter):
+        CRUDL.aggregate(crudl_mock_model, **kwargs)
+
+
+@pytest.mark.parametrize('trace_memory', [False, True])
+def test_list_method_prints_stats_as_json_on_stderr(crudl_mock_model,
+                                                    trace_memory):
+    """
+    Este test comprueba que el método `list` con `stats="json"` imprime por
+    stderr una línea JSON con los tiempos por fase, el número de sentencias,
+    las filas y la memoria, trazando la de Python sólo con `trace_memory`, y
+    deja la base de datos como estaba
+    """
+
+    from peewee2click import CRUDL
+    import json
+
+    for i in range(3):
+        crudl_mock_model.create(text_attr="mock", char_attr="", int_attr=i,
+                                bool_attr=True)
+
+    database = crudl_mock_model._meta.database
+    with patch('peewee2click.click.echo') as echo_mock:
+        assert CRUDL.list(crudl_mock_model, ['id', 'int_attr'],
+                          stats="json", trace_memory=trace_memory)
+
+    assert 'execute_sql' not in vars(database)
+    args, kwargs = echo_mock.call_args
+    assert kwargs == {'err': True}
+    stats = json.loads(args[0])
+    assert stats['model'] == crudl_mock_model._meta.name
+    assert stats['statements'] == 1
+    assert stats['rows'] == 3
+    assert stats['max_rss_kb'] > 0
+    if trace_memory:
+        assert stats['peak_memory_bytes'] > 0
+    else:
+        assert stats['peak_memory_bytes'] is None
+    assert stats['total_s'] == pytest.approx(
+        sum(stats[name] for name in
+            ('query_s', 'format_s', 'render_s', 'other_s')))
+
+
+def test_stats_account_fetching_to_query_and_serialization_to_format():
+    """
+    Este test comprueba que el tiempo de leer las filas de un cursor se
+    contabiliza como `query` y el de serializarlas en `print_rows` como
+    `format`
+    """
+
+    import json
+    import time
+    import peewee2click
+    from peewee2click import CRUDL, Stats, _fetching
+
+    def _rows():
+        for i in range(2):
+            time.sleep(0.02)
+            yield [i]
+
+    dumps = json.dumps
+
+    def _dumps(*args, **kwargs):
+        time.sleep(0.02)
+        return dumps(*args, **kwargs)
+
+    stats = Stats()
+    with patch('peewee2click._stats', stats), \
+            patch('peewee2click.json.dumps', side_effect=_dumps), \
+            patch('peewee2click.click.echo'):
+        CRUDL.print_rows(_fetching(_rows()), ['id'], 'jsonl')
+
+    assert peewee2click._stats is None
+    assert stats.timings['query'] >= 0.04
+    assert stats.timings['format'] >= 0.04
+    assert stats.timings['render'] < 0.04
+
+
+def test_stats_sections_do_not_overlap():
+    """
+    Este test comprueba que el tiempo de una sección anidada en otra sólo se
+    contabiliza en la sección interior
+    """
+
+    from peewee2click import Stats
+
+    ticks = iter(range(10))
+    with patch('peewee2click.time.perf_counter',
+               side_effect=lambda: next(ticks)):
+        stats = Stats()                 # 0
+        with stats.section('render'):   # 1
+            with stats.section('query'):  # 2
+                pass                    # 3
+        stats._switch()                 # 4 (render), 5
+
+    assert stats.timings == {'query': 1, 'format': 0, 'render': 2,
+                             'other': 2}
+
+
+def test_model_commands_accept_stats_option(crudl_mock_model):
+    """
+    Este test comprueba que los comandos generados por `model_command`
+    aceptan la opción `--stats`
+    """
+
+    from peewee2click import CRUDL
+
+    obj = crudl_mock_model.create(text_attr="mock", char_attr="", int_attr=1,
+                                  bool_attr=True)
+
+    command = CRUDL.model_command(crudl_mock_model, "show")
+    result = CliRunner().invoke(command, [str(obj.id), '--stats', 'text'])
+
+    assert result.exit_code == 0, result.output
+    assert 'statements: 1' in result.output
+    assert 'rows: 1' in result.output
+
+
+def test_list_method_explain_flags_full_scans(crudl_mock_model):
+    """
+    Este test comprueba que el método `list` con `explain` imprime el SQL y
+    el plan de la consulta sin ejecutarla, marca el recorrido completo de la
+    tabla y sugiere indexar los campos del filtro
+    """
+
+    from peewee2click import CRUDL
+
+    runner = CliRunner()
+    with runner.isolation() as out, \
+            _count_statements(crudl_mock_model) as execute_mock:
+        assert not CRUDL.list(crudl_mock_model, ['id'],
+                              where=['int_attr>=3', 'char_attr=x'],
+                              explain=True)
+
+    output = out.getvalue().decode()
+    assert execute_mock.call_count == 1
+    assert execute_mock.call_args[0][0].startswith('EXPLAIN QUERY PLAN ')
+    assert 'SQL: SELECT' in output
+    assert 'Full table scan: SCAN' in output
+    assert 'Consider indexing crudlmockmodel (int_attr, char_attr).' in output
+
+
+@pytest.mark.parametrize('plan,full_scan', [
+    ('SCAN t1', True),
+    ('SCAN TABLE crudlmockmodel', True),
+    ('SCAN TABLE crudlmockmodel AS t1', True),
+    ('Seq Scan on crudlmockmodel t1  (cost=0.00..1.01 rows=1 width=4)', True),
+    ('SEARCH t1 USING INTEGER PRIMARY KEY (rowid=?)', False),
+    ('SEARCH TABLE crudlmockmodel AS t1 USING INTEGER PRIMARY KEY (rowid=?)',
+     False),
+])
+def test_full_scan_re_matches_plans_of_every_version(plan, full_scan):
+    """
+    Este test comprueba que `_FULL_SCAN_RE` reconoce los recorridos completos
+    tanto en los planes de SQLite anteriores a 3.36, que incluyen el alias de
+    la tabla, como en los actuales y en los de PostgreSQL
+    """
+
+    from peewee2click import _FULL_SCAN_RE
+
+    assert bool(_FULL_SCAN_RE.search(plan)) is full_scan
+
+
+@pytest.mark.parametrize('method,args,kwargs', [
+    ('show', ('1', ), {}),
+    ('update', ('1', True), {'int_attr': 2}),
+    ('list', (['id'], ), {'limit': 10, 'after': 5}),
+])
+def test_explain_accepts_primary_key_searches(crudl_mock_model, method, args,
+                                              kwargs):
+    """
+    Este test comprueba que `show`, `update` y `list` paginado con `explain`
+    no marcan como recorrido completo las búsquedas por clave primaria ni
+    modifican los datos
+    """
+
+    from peewee2click import CRUDL
+
+    crudl_mock_model.create(text_attr="mock", char_attr="", int_attr=1,
+                            bool_attr=True)
+
+    runner = CliRunner()
+    with runner.isolation() as out:
+        assert getattr(CRUDL, method)(crudl_mock_model, *args, explain=True,
+                                      **kwargs)
+
+    assert 'Full table scan' not in out.getvalue().decode()
+    assert crudl_mock_model.get().int_attr == 1
+
+
+def test_condition_fields_walks_expressions(crudl_mock_model):
+    """
+    Este test comprueba que `_condition_fields` devuelve los campos
+    referenciados por una expresión de peewee
+    """
+
+    from peewee2click import _condition_fields
+
+    model = crudl_mock_model
+    condition = (((model.int_attr > 1) & (model.char_attr == 'x')) |
+                 model.id.in_([1, 2]))
+
+    assert list(_condition_fields(condition)) == [model.int_attr,
+                                                  model.char_attr, model.id]
+
+
+@pytest.fixture
+def crudl_cached(tmpdir):
+    from peewee2click import CRUDL, ResultCache
+
+    class CachedCRUDL(CRUDL):
+        CACHE = ResultCache(str(tmpdir.join("cache")))
+
+    return CachedCRUDL
+
+
+def test_show_and_list_are_served_from_the_cache(crudl_mock_model,
+                                                 crudl_cached):
+    """
+    Este test comprueba que con `CACHE` los métodos `show` y `list` repiten
+    la salida guardada sin consultar la base de datos, y que las escrituras
+    a través de `CRUDL` invalidan las entradas del modelo
+    """
+
+    obj = crudl_mock_model.create(text_attr="mock", char_attr="",
+                                  int_attr=1, bool_attr=True)
+    runner = CliRunner()
+
+    def _run(method, *args, **kwargs):
+        with runner.isolation() as out, \
+                _count_statements(crudl_mock_model) as execute_mock:
+            result = getattr(crudl_cached, method)(crudl_mock_model, *args,
+                                                   **kwargs)
+        return result, out.getvalue().decode(), execute_mock.call_count
+
+    first = _run("show", obj.id)
+    assert first[0] and first[2] == 1
+    assert _run("show", obj.id) == first[:2] + (0, )
+
+    listed = _run("list", ["id", "int_attr"], limit=1)
+    assert _run("list", ["id", "int_attr"], limit=1) == listed[:2] + (0, )
+    assert _run("list", ["id", "int_attr"], limit=1, stream=True)[2] == 1
+
+    crudl_cached.update(crudl_mock_model, obj.id, True, int_attr=7)
+
+    result, output, statements = _run("show", obj.id)
+    assert statements == 1
+    assert "7" in output and output != first[1]
+
+
+def test_result_cache_ignores_entries_of_changed_databases(
+        crudl_mock_model, crudl_cached):
+    """
+    Este test comprueba que las entradas de la caché se ignoran cuando la
+    base de datos informa de un cambio
+    """
+
+    cache = crudl_cached.CACHE
+    with patch('peewee2click._database_version', return_value=[1]):
+        cache.set(crudl_mock_model, "key", {"out": "", "err": "",
+                                            "result": True})
+        assert cache.get(crudl_mock_model, "key")["result"]
+
+    with patch('peewee2click._database_version', return_value=[2]):
+        assert cache.get(crudl_mock_model, "key") is None
+
+
+def test_result_cache_evicts_the_least_recently_used(crudl_mock_model,
+                                                     tmpdir):
+    """
+    Este test comprueba que la caché elimina las entradas usadas hace más
+    tiempo cuando superan el tamaño máximo
+    """
+
+    import os
+    from peewee2click import ResultCache
+
+    cache = ResultCache(str(tmpdir.join("cache")), max_size=250,
+                        max_entry_size=250)
+    entry = {"out": "x" * 50, "err": "", "result": True}
+
+    for number, key in enumerate(["a", "b"]):
+        cache.set(crudl_mock_model, key, entry)
+        os.utime(cache._path(crudl_mock_model, key), (number, number))
+    cache.get(crudl_mock_model, "a")
+    cache.set(crudl_mock_model, "c", entry)
+
+    assert cache.get(crudl_mock_model, "a") is not None
+    assert cache.get(crudl_mock_model, "b") is None
+    assert cache.get(crudl_mock_model, "c") is not None
+
+
+@pytest.mark.parametrize('kwargs', [
+    {},
+    {'limit': 1, 'fmt': 'jsonl'},
+])
+def test_unbounded_and_streamed_lists_skip_the_cache(crudl_mock_model,
+                                                     crudl_cached, tmpdir,
+                                                     kwargs):
+    """
+    Este test comprueba que el método `list` no guarda en la caché los
+    listados sin límite ni los formatos para máquinas, que se imprimen por
+    partes
+    """
+
+    crudl_mock_model.create(text_attr="mock", char_attr="", int_attr=1,
+                            bool_attr=True)
+
+    with CliRunner().isolation():
+        assert crudl_cached.list(crudl_mock_model, ["id"], **kwargs)
+
+    assert not tmpdir.join("cache").check()
+
+
+def test_result_cache_replays_stderr_and_skips_large_entries(
+        crudl_mock_model, tmpdir):
+    """
+    Este test comprueba que la caché repite también la salida de error y no
+    guarda las entradas mayores que `max_entry_size`
+    """
+
+    from peewee2click import ResultCache
+
+    def _command():
+        click.echo("out")
+        click.echo("err", err=True)
+        return True
+
+    cache = ResultCache(str(tmpdir.join("cache")))
+    runner = CliRunner()
+    for _ in range(2):
+        # The runner mixes stderr into stdout.
+        with runner.isolation() as out:
+            assert cache.call(crudl_mock_model, "key", _command)
+        assert out.getvalue().decode() == "out\nerr\n"
+    assert cache.get(crudl_mock_model, "key")["err"] == "err\n"
+
+    cache = ResultCache(str(tmpdir.join("small")), max_entry_size=10)
+    with runner.isolation():
+        cache.call(crudl_mock_model, "key", _command)
+    assert cache.get(crudl_mock_model, "key") is None
@@ -0,0 +1,413 @@
+from unittest.mock import MagicMock, patch
+import re
+import sys
+
+from click.testing import CliRunner
+import pytest
+
+
+def test_group_help_doesnt_resolve_models():
+    """
+    Este test comprueba que el grupo devuelto por `CRUDL.group` lista sus
+    modelos en `--help` sin resolver ninguno ni construir sus comandos, de
+    modo que el tiempo de arranque no crece con el número de modelos
+    """
+
+    from peewee2click import CRUDL
+
+    loaders = {"model{}".format(i): MagicMock() for i in range(200)}
+    cli = CRUDL.group(loaders)
+
+    result = CliRunner().invoke(cli, ["--help"])
+
+    assert result.exit_code == 0
+    assert "model0" in result.output and "model199" in result.output
+    assert not any(loader.called for loader in loaders.values())
+
+
+def test_group_resolves_only_the_invoked_model(crudl_mock_model):
+    """
+    Este test comprueba que invocar un comando del grupo sólo resuelve el
+    modelo de ese comando, y una única vez
+    """
+
+    from peewee2click import CRUDL
+
+    loader = MagicMock(return_value=crudl_mock_model)
+    other_loader = MagicMock()
+    cli = CRUDL.group({"mock": loader, "other": other_loader})
+
+    runner = CliRunner()
+    runner.invoke(cli, ["mock", "show", "1"])
+    runner.invoke(cli, ["mock", "list"])
+
+    loader.assert_called_once_with()
+    assert not other_loader.called
+
+
+def test_group_commands_work_end_to_end(crudl_mock_model):
+    """
+    Este test comprueba que los comandos construidos por el grupo crean,
+    muestran, actualizan, listan y borran registros del modelo
+    """
+
+    from peewee2click import CRUDL
+
+    cli = CRUDL.group({"mock": crudl_mock_model},
+                      list_fields={"mock": ["id", "int_attr"]})
+    runner = CliRunner()
+
+    result = runner.invoke(cli, ["mock", "create", "--force",
+                                 "--text-attr", "foo", "--char-attr", "bar",
+                                 "--int-attr", "3", "--bool-attr", "true"])
+    assert result.exit_code == 0
+    assert crudl_mock_model.get().int_attr == 3
+
+    result = runner.invoke(cli, ["mock", "update", "1", "--force",
+                                 "--int-attr", "4"])
+    assert result.exit_code == 0
+    assert crudl_mock_model.get().int_attr == 4
+
+    result = runner.invoke(cli, ["mock", "show", "1"])
+    assert "'foo'" in result.output
+
+    result = runner.invoke(cli, ["mock", "list"])
+    assert "int_attr" in result.output and "text_attr" not in result.output
+
+    result = runner.invoke(cli, ["mock", "delete", "1", "--force"])
+    assert result.exit_code == 0
+    assert not crudl_mock_model.select().exists()
+
+
+def test_resolve_model_accepts_import_paths():
+    """
+    Este test comprueba que `_resolve_model` importa los modelos dados como
+    cadenas ``paquete.modulo:Modelo``
+    """
+
+    import collections
+    from peewee2click import _resolve_model
+
+    assert _resolve_model("collections:OrderedDict") is \
+        collections.OrderedDict
+
+
+def test_group_shell_runs_commands_in_the_same_process(crudl_mock_model):
+    """
+    Este test comprueba que el comando `shell` del grupo ejecuta las líneas
+    de comandos leídas de stdin, informando de los errores sin detenerse, y
+    construye cada comando una única vez
+    """
+
+    from peewee2click import CRUDL
+
+    loader = MagicMock(return_value=crudl_mock_model)
+    cli = CRUDL.group({"mock": loader})
+    script = "\n".join([
+        "# comment",
+        "mock create --force --text-attr foo --char-attr bar --int-attr 3 "
+        "--bool-attr true",
+        "",
+        "mock show 1",
+        "mock update 1 --force --int-attr 4",
+        "mock show 2",
+        "mock show abc",
+        "mock list --unknown",
+        "shell",
+        "mock show 1",
+        "exit",
+        "mock delete 1 --force",
+    ])
+
+    with patch.object(CRUDL, 'model_command',
+                      side_effect=CRUDL.model_command) as build_mock:
+        result = CliRunner().invoke(cli, ["shell"], input=script)
+
+    assert result.exit_code == 0, result.output
+    assert crudl_mock_model.get().int_attr == 4
+    assert "Registry 2 does not exists." in result.output
+    assert "Error: invalid literal for int()" in result.output
+    assert "no such option: --unknown" in result.output
+    assert "shell can't be run from another command." in result.output
+    loader.assert_called_once_with()
+    assert build_mock.call_count == 4
+
+
+def test_group_batch_runs_commands_in_one_transaction(crudl_mock_model,
+                                                      tmpdir):
+    """
+    Este test comprueba que el comando `batch` del grupo ejecuta todas las
+    líneas de comandos de un fichero, y que una línea que falla deshace los
+    cambios hechos desde el último commit
+    """
+
+    from peewee2click import CRUDL
+
+    cli = CRUDL.group({"mock": crudl_mock_model})
+    create = ("mock create --force --text-attr foo --char-attr bar "
+              "--bool-attr true --int-attr {}\n")
+    script = tmpdir.join("script.txt")
+    runner = CliRunner()
+
+    script.write(create.format(1) + create.format(2) + "# done\n")
+    result = runner.invoke(cli, ["batch", str(script)])
+    assert result.exit_code == 0, result.output
+    assert crudl_mock_model.select().count() == 2
+
+    script.write(create.format(3) + "mock update 9 --force --int-attr 1\n")
+    result = runner.invoke(cli, ["batch", str(script)])
+    assert result.exit_code == 1
+    assert "Line 2: mock update 9 --force --int-attr 1 failed." in \
+        result.output
+    assert crudl_mock_model.select().count() == 2
+
+    script.write(create.format(3) + "mock show abc\n")
+    result = runner.invoke(cli, ["batch", str(script)])
+    assert result.exit_code == 1
+    assert "Line 2: invalid literal for int()" in result.output
+    assert "rolled back" in result.output
+    assert crudl_mock_model.select().count() == 2
+
+    script.write(create.format(3) + create.format(4) + "mock show 9\n")
+    result = runner.invoke(cli, ["batch", "--commit-every", "2",
+                                 str(script)])
+    assert result.exit_code == 1
+    assert crudl_mock_model.select().count() == 4
+
+
+def test_group_batch_lines_skip_the_cache(crudl_mock_model, tmpdir):
+    """
+    Este test comprueba que las líneas de `batch` no usan la caché, de modo
+    que lo leído dentro de una transacción que se deshace no se repite
+    después
+    """
+
+    from peewee2click import CRUDL, ResultCache
+
+    class CachedCRUDL(CRUDL):
+        CACHE = ResultCache(str(tmpdir.join("cache")))
+
+    obj = crudl_mock_model.create(text_attr="foo", char_attr="bar",
+                                  int_attr=1, bool_attr=True)
+    cli = CachedCRUDL.group({"mock": crudl_mock_model})
+    script = tmpdir.join("script.txt")
+    runner = CliRunner()
+
+    script.write("mock update {0} --force --int-attr 5\n"
+                 "mock show {0}\n"
+                 "mock show 99\n".format(obj.id))
+    result = runner.invoke(cli, ["batch", str(script)])
+    assert result.exit_code == 1
+    assert "rolled back" in result.output
+    assert not tmpdir.join("cache").check()
+
+    result = runner.invoke(cli, ["mock", "show", str(obj.id)])
+    assert result.exit_code == 0
+    assert re.search(r"int_attr\s+1\n", result.output), result.output
+
+
+def test_group_dump_exports_models_concurrently(tmpdir):
+    """
+    Este test comprueba que el comando `dump` del grupo escribe un fichero
+    por modelo, desde varios hilos con sus propias conexiones, e imprime las
+    filas exportadas de cada modelo
+    """
+
+    import json
+    from peewee import IntegerField, Model, SqliteDatabase
+    from peewee2click import CRUDL
+
+    database = SqliteDatabase(str(tmpdir.join("dump.db")))
+
+    class First(Model):
+        value = IntegerField()
+
+        class Meta:
+            db_table = "first"
+
+    class Second(First):
+        class Meta:
+            db_table = "second"
+
+    for model in (First, Second):
+        model._meta.database = database
+    database.create_tables([First, Second])
+    First.insert_many([{"value": i} for i in range(3)]).execute()
+    Second.insert_many([{"value": i} for i in range(5)]).execute()
+
+    cli = CRUDL.group({"first": First, "second": Second})
+    output = tmpdir.join("out")
+    result = CliRunner().invoke(cli, ["dump", "--output-dir", str(output),
+                                      "--workers", "2"])
+
+    assert result.exit_code == 0, result.output
+    lines = output.join("second.jsonl").read().splitlines()
+    assert [json.loads(line) for line in lines] == [
+        {"id": i + 1, "value": i} for i in range(5)]
+    assert len(output.join("first.jsonl").read().splitlines()) == 3
+    assert re.search(r"first\s+3", result.output)
+    assert re.search(r"second\s+5", result.output)
+
+    result = CliRunner().invoke(cli, ["dump", "third"])
+    assert result.exit_code == 2
+
+
+@pytest.fixture
+def partitioned_model(tmpdir, monkeypatch):
+    """
+    Modelo importable sobre una base de datos en fichero con 10 filas, para
+    que los procesos de trabajo puedan importarlo de nuevo
+    """
+
+    tmpdir.join("partitioned_models.py").write("\n".join([
+        "from peewee import IntegerField, Model, SqliteDatabase",
+        "",
+        "class Partitioned(Model):",
+        "    value = IntegerField()",
+        "",
+        "    class Meta:",
+        "        database = SqliteDatabase({!r})".format(
+            str(tmpdir.join("partitioned.db"))),
+    ]))
+    monkeypatch.syspath_prepend(str(tmpdir))
+    monkeypatch.delitem(sys.modules, "partitioned_models", raising=False)
+
+    from peewee2click import _resolve_model
+
+    model = _resolve_model("partitioned_models:Partitioned")
+    model.create_table()
+    model.insert_many([{"value": i} for i in range(10)]).execute()
+    return model
+
+
+@pytest.mark.parametrize('split,ranges', [
+    ("minmax", [(None, 4), (4, 7), (7, None)]),
+    ("quantiles", [(None, 4), (4, 7), (7, None)]),
+])
+def test_pk_ranges_split_the_primary_keys(partitioned_model, split, ranges):
+    """
+    Este test comprueba que `_pk_ranges` divide las claves primarias en
+    rangos consecutivos que las cubren todas
+    """
+
+    from peewee2click import _pk_ranges
+
+    assert _pk_ranges(partitioned_model, 3, split=split) == ranges
+    assert _pk_ranges(partitioned_model, 3, split=split,
+                      condition=partitioned_model.id > 10) == [(None, None)]
+
+
+def test_pk_ranges_splits_text_keys_by_quantiles():
+    """
+    Este test comprueba que `_pk_ranges` divide por cuantiles las claves
+    primarias que no son enteras aunque se pida dividir entre MIN y MAX
+    """
+
+    from peewee import CharField, Model, SqliteDatabase
+    from peewee2click import _pk_ranges
+
+    class Keyed(Model):
+        code = CharField(primary_key=True)
+
+        class Meta:
+            database = SqliteDatabase(":memory:")
+
+    Keyed.create_table()
+    Keyed.insert_many([{"code": c} for c in "abcdef"]).execute()
+
+    assert _pk_ranges(Keyed, 3) == [(None, "c"), ("c", "e"), ("e", None)]
+
+
+@pytest.mark.parametrize('workers', [1, 2])
+def test_group_export_merges_partitions_in_key_order(partitioned_model,
+                                                     tmpdir, workers):
+    """
+    Este test comprueba que el comando `export` del grupo exporta los rangos
+    de claves primarias de un modelo, en procesos separados si hay varios
+    workers, y los une en el orden de las claves
+    """
+
+    from peewee2click import CRUDL
+
+    cli = CRUDL.group({"partitioned": "partitioned_models:Partitioned"})
+    output = tmpdir.join("out.csv")
+    result = CliRunner().invoke(cli, [
+        "export", "partitioned", str(output), "--format", "csv",
+        "--workers", str(workers), "--partitions", "3",
+        "--where", "value>=1"])
+
+    assert result.exit_code == 0, result.output
+    assert output.read().splitlines() == ["id,value"] + [
+        "{},{}".format(i + 1, i) for i in range(1, 10)]
+    assert not tmpdir.listdir("out.0*")
+
+
+def test_group_export_keeps_shards(partitioned_model, tmpdir):
+    """
+    Este test comprueba que el comando `export` del grupo mantiene un
+    fichero por rango de claves primarias con `--shards`
+    """
+
+    from peewee2click import CRUDL
+
+    cli = CRUDL.group({"partitioned": "partitioned_models:Partitioned"})
+    result = CliRunner().invoke(cli, [
+        "export", "partitioned", str(tmpdir.join("out.jsonl")),
+        "--workers", "1", "--partitions", "2", "--shards"])
+
+    assert result.exit_code == 0, result.output
+    assert len(tmpdir.join("out.0000.jsonl").read().splitlines()) == 5
+    assert len(tmpdir.join("out.0001.jsonl").read().splitlines()) == 5
+    assert not tmpdir.join("out.jsonl").check()
+
+
+@pytest.mark.parametrize('watermark', [None, "updated"])
+def test_group_dump_since_last_only_exports_new_rows(tmpdir, watermark):
+    """
+    Este test comprueba que el comando `dump` del grupo con `--since-last`
+    sólo exporta las filas posteriores a la marca guardada por la ejecución
+    anterior, y guarda la nueva
+    """
+
+    import datetime
+    import json
+    from peewee import DateTimeField, Model, SqliteDatabase
+    from peewee2click import CRUDL
+
+    class Event(Model):
+        updated = DateTimeField()
+
+        class Meta:
+            database = SqliteDatabase(str(tmpdir.join("events.db")))
+
+    Event.create_table()
+    start = datetime.datetime(2017, 1, 1)
+
+    def _add(*hours):
+        for hour in hours:
+            Event.create(updated=start + datetime.timedelta(hours=hour))
+
+    cli = CRUDL.group({"event": Event})
+    output = tmpdir.join("out")
+    state = tmpdir.join("state.json")
+    args = ["dump", "--output-dir", str(output), "--format", "csv",
+            "--since-last", str(state)]
+    if watermark is not None:
+        args += ["--watermark", watermark]
+
+    _add(0, 1)
+    result = CliRunner().invoke(cli, args)
+    assert result.exit_code == 0, result.output
+    assert len(output.join("event.csv").read().splitlines()) == 3
+
+    _add(2)
+    result = CliRunner().invoke(cli, args)
+    assert result.exit_code == 0, result.output
+    assert output.join("event.csv").read().splitlines()[1:] == [
+        "3,2017-01-01 02:00:00"]
+
+    result = CliRunner().invoke(cli, args)
+    assert result.exit_code == 0, result.output
+    assert output.join("event.csv").read().splitlines() == ["id,updated"]
+    expected = 3 if watermark is None else "2017-01-01 02:00:00"
+    assert json.loads(state.read()) == {"event": expected}